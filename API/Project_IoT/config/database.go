@@ -4,6 +4,8 @@ import (
 	"fmt"
 	"log"
 	"os"
+	"strconv"
+	"time"
 
 	"gorm.io/driver/mysql"
 	"gorm.io/gorm"
@@ -22,18 +24,66 @@ func ConnectDatabase() {
 		os.Getenv("DB_NAME"),
 	)
 
-	database, err := gorm.Open(mysql.Open(dsn), &gorm.Config{})
+	database, err := OpenDatabase(dsn, &gorm.Config{})
 	if err != nil {
 		log.Fatal("❌ Failed to connect to database:", err)
 	}
 
-	// Auto migrate models
-	database.AutoMigrate(
+	DB = database
+	fmt.Println("✅ Database connected successfully!")
+
+	// Migrasi tidak lagi dijalankan setiap boot; pakai `go run . migrate`
+	// atau set DB_AUTO_MIGRATE=true untuk perilaku lama
+	if os.Getenv("DB_AUTO_MIGRATE") == "true" {
+		Migrate()
+	}
+}
+
+// OpenDatabase membuka koneksi MySQL dengan PrepareStmt dan pool dari .env
+// (dipakai ConnectDatabase dan benchmark di controllers)
+func OpenDatabase(dsn string, cfg *gorm.Config) (*gorm.DB, error) {
+	// PrepareStmt: cache prepared statements per connection, so the dashboard's
+	// 1 Hz polling doesn't re-prepare the same queries on every request
+	cfg.PrepareStmt = true
+	database, err := gorm.Open(mysql.Open(dsn), cfg)
+	if err != nil {
+		return nil, err
+	}
+
+	// Connection pool (semua bisa diatur lewat .env)
+	sqlDB, err := database.DB()
+	if err != nil {
+		return nil, err
+	}
+	sqlDB.SetMaxOpenConns(envInt("DB_MAX_OPEN_CONNS", 25))
+	sqlDB.SetMaxIdleConns(envInt("DB_MAX_IDLE_CONNS", 10))
+	sqlDB.SetConnMaxLifetime(envDuration("DB_CONN_MAX_LIFETIME", 30*time.Minute))
+	sqlDB.SetConnMaxIdleTime(envDuration("DB_CONN_MAX_IDLE_TIME", 5*time.Minute))
+	return database, nil
+}
+
+// Migrate menjalankan AutoMigrate untuk semua model
+func Migrate() {
+	if err := DB.AutoMigrate(
 		&models.User{},
 		&models.Device{},
 		&models.SensorData{},
-	)
+	); err != nil {
+		log.Fatal("❌ Failed to migrate database:", err)
+	}
+	fmt.Println("✅ Database migrated successfully!")
+}
 
-	DB = database
-	fmt.Println("✅ Database connected successfully!")
+func envInt(key string, fallback int) int {
+	if value, err := strconv.Atoi(os.Getenv(key)); err == nil {
+		return value
+	}
+	return fallback
+}
+
+func envDuration(key string, fallback time.Duration) time.Duration {
+	if value, err := time.ParseDuration(os.Getenv(key)); err == nil {
+		return value
+	}
+	return fallback
 }
@@ -413,6 +413,7 @@ import (
 	"strconv"
 
 	"github.com/gin-gonic/gin"
+	"gorm.io/gorm"
 	"project_iot/config"
 	"project_iot/models"
 )
@@ -475,8 +476,14 @@ func GetDevice(c *gin.Context) {
 		return
 	}
 
+	// Dipoll dashboard secara berkala: ambil hanya kolom user yang tampil di JSON
+	// (password hash & deleted_at tidak perlu dibaca)
 	var device models.Device
-	if err := config.DB.Where("id = ?", deviceID).Preload("User").First(&device).Error; err != nil {
+	if err := config.DB.Where("id = ?", deviceID).
+		Preload("User", func(db *gorm.DB) *gorm.DB {
+			return db.Select("id", "username", "email", "role", "created_at", "updated_at")
+		}).
+		First(&device).Error; err != nil {
 		c.JSON(http.StatusNotFound, gin.H{"error": "Device not found"})
 		return
 	}
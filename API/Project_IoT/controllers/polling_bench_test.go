@@ -0,0 +1,191 @@
+package controllers
+
+import (
+	"fmt"
+	"net/http"
+	"net/http/httptest"
+	"os"
+	"strconv"
+	"sync"
+	"sync/atomic"
+	"testing"
+	"time"
+
+	"github.com/gin-gonic/gin"
+	"gorm.io/driver/mysql"
+	"gorm.io/gorm"
+	"gorm.io/gorm/logger"
+	"project_iot/config"
+	"project_iot/models"
+)
+
+// Benchmark endpoint yang dipoll dashboard setiap detik, sebelum vs sesudah
+// optimasi query + PrepareStmt, terhadap MySQL lokal (pakai database khusus):
+//
+//   BENCH_MYSQL_DSN="root:@tcp(localhost:3306)/smart_garden_bench?charset=utf8mb4&parseTime=True&loc=Local" \
+//     go test ./controllers -run '^$' -bench . -benchmem
+//
+// Tanpa BENCH_MYSQL_DSN semua benchmark di-skip. Tabel di-migrate, data uji
+// (1 user, 1 device, benchReadings data sensor) dibuat lalu dihapus lagi.
+
+const benchReadings = 2000
+
+var (
+	benchOnce    sync.Once
+	benchErr     error
+	benchBefore  *gorm.DB // konfigurasi lama: tanpa PrepareStmt, pool default
+	benchAfter   *gorm.DB // config.OpenDatabase: PrepareStmt + pool dari .env
+	benchUser    models.User
+	benchDevice  models.Device
+	benchQueries int64
+)
+
+func TestMain(m *testing.M) {
+	code := m.Run()
+	if benchDevice.ID != 0 {
+		benchAfter.Where("device_id = ?", benchDevice.ID).Delete(&models.SensorData{})
+		benchAfter.Unscoped().Delete(&benchDevice)
+		benchAfter.Unscoped().Delete(&benchUser)
+	}
+	os.Exit(code)
+}
+
+// countQueries menghitung setiap SELECT (termasuk Preload) untuk metrik queries/op
+func countQueries(db *gorm.DB) error {
+	return db.Callback().Query().After("gorm:query").Register("bench:count", func(*gorm.DB) {
+		atomic.AddInt64(&benchQueries, 1)
+	})
+}
+
+func setupBenchDB() error {
+	dsn := os.Getenv("BENCH_MYSQL_DSN")
+	silent := logger.Default.LogMode(logger.Silent)
+
+	before, err := gorm.Open(mysql.Open(dsn), &gorm.Config{Logger: silent})
+	if err != nil {
+		return err
+	}
+	after, err := config.OpenDatabase(dsn, &gorm.Config{Logger: silent})
+	if err != nil {
+		return err
+	}
+	for _, db := range []*gorm.DB{before, after} {
+		if err := countQueries(db); err != nil {
+			return err
+		}
+	}
+	benchBefore, benchAfter = before, after
+
+	if err := after.AutoMigrate(&models.User{}, &models.Device{}, &models.SensorData{}); err != nil {
+		return err
+	}
+	suffix := strconv.FormatInt(time.Now().UnixNano(), 36)
+	benchUser = models.User{Username: "bench-" + suffix, Email: "bench-" + suffix + "@example.com", Password: "x", Role: "user"}
+	if err := after.Create(&benchUser).Error; err != nil {
+		return err
+	}
+	benchDevice = models.Device{DeviceName: "Bench Device", Location: "bench", UserID: benchUser.ID, IsActive: true, AutoMode: true}
+	if err := after.Create(&benchDevice).Error; err != nil {
+		return err
+	}
+	readings := make([]models.SensorData, benchReadings)
+	start := time.Now().Add(-benchReadings * time.Second)
+	for i := range readings {
+		readings[i] = models.SensorData{
+			DeviceID: benchDevice.ID, Temperature: 28.5, Humidity: 70, TemperatureSource: "sensor",
+			HumiditySource: "sensor", SoilMoisturePercent: 55, WaterPercentage: 80, PumpStatus: "OFF",
+			SystemStatus: "NORMAL", ServerTimestamp: start.Add(time.Duration(i) * time.Second),
+		}
+	}
+	return after.CreateInBatches(readings, 500).Error
+}
+
+func benchDBs(b *testing.B) {
+	if os.Getenv("BENCH_MYSQL_DSN") == "" {
+		b.Skip("BENCH_MYSQL_DSN tidak di-set")
+	}
+	benchOnce.Do(func() { benchErr = setupBenchDB() })
+	if benchErr != nil {
+		b.Fatalf("setup database benchmark: %v", benchErr)
+	}
+}
+
+func benchmarkEndpoint(b *testing.B, db *gorm.DB, route, path string, handler gin.HandlerFunc) {
+	config.DB = db
+	gin.SetMode(gin.ReleaseMode)
+	r := gin.New()
+	// Menggantikan AuthMiddleware (dibenchmark terpisah di package middleware)
+	r.GET(route, func(c *gin.Context) { c.Set("user_id", benchUser.ID) }, handler)
+	req := httptest.NewRequest(http.MethodGet, path, nil)
+
+	b.ReportAllocs()
+	b.ResetTimer()
+	atomic.StoreInt64(&benchQueries, 0)
+	for i := 0; i < b.N; i++ {
+		w := httptest.NewRecorder()
+		r.ServeHTTP(w, req)
+		if w.Code != http.StatusOK {
+			b.Fatalf("status %d: %s", w.Code, w.Body.String())
+		}
+	}
+	b.ReportMetric(float64(atomic.LoadInt64(&benchQueries))/float64(b.N), "queries/op")
+}
+
+// getLatestSensorDataBefore adalah query GetLatestSensorData sebelum optimasi
+// (Preload("Device") + First, device dibaca dua kali)
+func getLatestSensorDataBefore(c *gin.Context) {
+	deviceID, _ := strconv.ParseUint(c.Param("device_id"), 10, 32)
+	var device models.Device
+	if err := config.DB.Where("id = ?", deviceID).First(&device).Error; err != nil {
+		c.JSON(http.StatusNotFound, gin.H{"error": "Device tidak ditemukan"})
+		return
+	}
+	var sensorData models.SensorData
+	if err := config.DB.Preload("Device").
+		Where("device_id = ?", deviceID).
+		Order("server_timestamp DESC").
+		First(&sensorData).Error; err != nil {
+		c.JSON(http.StatusNotFound, gin.H{"error": "Data sensor tidak ditemukan"})
+		return
+	}
+	c.JSON(http.StatusOK, gin.H{"data": sensorData})
+}
+
+// getDeviceBefore adalah query GetDevice sebelum optimasi (Preload("User") semua kolom)
+func getDeviceBefore(c *gin.Context) {
+	deviceID, _ := strconv.ParseUint(c.Param("id"), 10, 32)
+	var device models.Device
+	if err := config.DB.Where("id = ?", deviceID).Preload("User").First(&device).Error; err != nil {
+		c.JSON(http.StatusNotFound, gin.H{"error": "Device not found"})
+		return
+	}
+	c.JSON(http.StatusOK, gin.H{"device": device})
+}
+
+const (
+	latestRoute = "/api/sensor-readings/device/:device_id/latest"
+	deviceRoute = "/api/devices/:id"
+)
+
+func latestPath() string { return fmt.Sprintf("/api/sensor-readings/device/%d/latest", benchDevice.ID) }
+func devicePath() string { return fmt.Sprintf("/api/devices/%d", benchDevice.ID) }
+
+func BenchmarkGetLatestSensorDataBefore(b *testing.B) {
+	benchDBs(b)
+	benchmarkEndpoint(b, benchBefore, latestRoute, latestPath(), getLatestSensorDataBefore)
+}
+
+func BenchmarkGetLatestSensorDataAfter(b *testing.B) {
+	benchDBs(b)
+	benchmarkEndpoint(b, benchAfter, latestRoute, latestPath(), GetLatestSensorData)
+}
+
+func BenchmarkGetDeviceBefore(b *testing.B) {
+	benchDBs(b)
+	benchmarkEndpoint(b, benchBefore, deviceRoute, devicePath(), getDeviceBefore)
+}
+
+func BenchmarkGetDeviceAfter(b *testing.B) {
+	benchDBs(b)
+	benchmarkEndpoint(b, benchAfter, deviceRoute, devicePath(), GetDevice)
+}
@@ -354,6 +354,12 @@ func GetSensorData(c *gin.Context) {
     })
 }
 
+// Kolom device yang dikirim bersama data sensor terbaru
+var latestDeviceColumns = []string{
+    "id", "device_name", "device_type", "location", "is_active", "ip_address",
+    "auto_mode", "last_command", "user_id", "created_at", "updated_at",
+}
+
 // UBAH: Fungsi GetLatestSensorData menjadi public
 func GetLatestSensorData(c *gin.Context) {
     deviceID, err := strconv.ParseUint(c.Param("device_id"), 10, 32)
@@ -370,25 +376,26 @@ func GetLatestSensorData(c *gin.Context) {
     }
     
     // UBAH: Hilangkan filter user_id - semua user bisa akses device apapun
+    // Hanya kolom yang ikut di response "device"; tanpa relasi User
     var device models.Device
-    if err := config.DB.Where("id = ?", deviceID).First(&device).Error; err != nil {
+    if err := config.DB.Select(latestDeviceColumns).Where("id = ?", deviceID).First(&device).Error; err != nil {
         log.Printf("❌ Device tidak ditemukan: DeviceID=%d", deviceID)
         c.JSON(http.StatusNotFound, gin.H{"error": "Device tidak ditemukan"})
         return
     }
     
+    // Endpoint ini dipanggil dashboard setiap detik: pakai index (device_id, server_timestamp)
+    // dan device yang sudah diambil di atas, bukan Preload("Device") (query ketiga)
     var sensorData models.SensorData
-    if err := config.DB.Preload("Device").
-        Where("device_id = ?", deviceID).
+    if err := config.DB.Where("device_id = ?", deviceID).
         Order("server_timestamp DESC").
-        First(&sensorData).Error; err != nil {
+        Limit(1).
+        Find(&sensorData).Error; err != nil || sensorData.ID == 0 {
         log.Printf("❌ Tidak ada data sensor untuk device %d", deviceID)
         c.JSON(http.StatusNotFound, gin.H{"error": "Data sensor tidak ditemukan"})
         return
     }
-    
-    log.Printf("✅ Data sensor terbaru berhasil diambil: DeviceID=%d, UserID=%d", 
-        deviceID, userID)
+    sensorData.Device = device
     
     c.JSON(http.StatusOK, gin.H{"data": sensorData})
 }
@@ -79,6 +79,12 @@ func main() {
 	// Connect DB
 	config.ConnectDatabase()
 
+	// `go run . migrate` menjalankan migrasi lalu keluar (tidak lagi di jalur startup)
+	if len(os.Args) > 1 && os.Args[1] == "migrate" {
+		config.Migrate()
+		return
+	}
+
 	// Gin router
 	r := gin.Default()
 
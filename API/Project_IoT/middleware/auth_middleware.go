@@ -1,21 +1,132 @@
 package middleware
 
 import (
+    "errors"
     "fmt"
     "log"
     "os"
     "strings"
-    
+    "sync"
+    "time"
+
     "github.com/gin-gonic/gin"
     "github.com/golang-jwt/jwt/v4"
 )
 
+// Claims yang sudah divalidasi, disimpan di cache sampai token kedaluwarsa
+type authClaims struct {
+    UserID    uint
+    Username  string
+    Role      string
+    ExpiresAt time.Time
+}
+
+// Dashboard polling 1 Hz mengirim token yang sama berkali-kali, jadi hasil
+// validasi JWT di-cache per token string (dibatasi oleh exp dan maxTokenCacheTTL)
+const (
+    maxTokenCacheTTL  = 5 * time.Minute
+    maxTokenCacheSize = 10000
+)
+
+type tokenCache struct {
+    mu      sync.RWMutex
+    entries map[string]*authClaims
+}
+
+var claimsCache = &tokenCache{entries: make(map[string]*authClaims)}
+
+var errMissingUserID = errors.New("user_id tidak ada di JWT claims")
+var errInvalidUserID = errors.New("tipe user_id tidak valid")
+
+func (tc *tokenCache) get(token string, now time.Time) (*authClaims, bool) {
+    tc.mu.RLock()
+    claims, ok := tc.entries[token]
+    tc.mu.RUnlock()
+    if !ok || !now.Before(claims.ExpiresAt) {
+        return nil, false
+    }
+    return claims, true
+}
+
+func (tc *tokenCache) put(token string, claims *authClaims, now time.Time) {
+    tc.mu.Lock()
+    if len(tc.entries) >= maxTokenCacheSize {
+        for key, entry := range tc.entries {
+            if !now.Before(entry.ExpiresAt) {
+                delete(tc.entries, key)
+            }
+        }
+        // Masih penuh: kosongkan saja, cache akan terisi lagi dengan token aktif
+        if len(tc.entries) >= maxTokenCacheSize {
+            tc.entries = make(map[string]*authClaims)
+        }
+    }
+    tc.entries[token] = claims
+    tc.mu.Unlock()
+}
+
+func (tc *tokenCache) reset() {
+    tc.mu.Lock()
+    tc.entries = make(map[string]*authClaims)
+    tc.mu.Unlock()
+}
+
+// parseToken memvalidasi JWT dan mengekstrak claims yang dipakai handler
+func parseToken(tokenString string, now time.Time) (*authClaims, error) {
+    token, err := jwt.Parse(tokenString, func(token *jwt.Token) (interface{}, error) {
+        // Pastikan signing method adalah HMAC
+        if _, ok := token.Method.(*jwt.SigningMethodHMAC); !ok {
+            return nil, fmt.Errorf("metode signing tidak dikenali: %v", token.Header["alg"])
+        }
+        return []byte(os.Getenv("JWT_SECRET")), nil
+    })
+    if err != nil {
+        return nil, err
+    }
+
+    claims, ok := token.Claims.(jwt.MapClaims)
+    if !ok || !token.Valid {
+        return nil, errors.New("claims JWT tidak valid")
+    }
+
+    userIDClaim, exists := claims["user_id"]
+    if !exists {
+        return nil, errMissingUserID
+    }
+
+    // Konversi user_id ke uint
+    var userID uint
+    switch v := userIDClaim.(type) {
+    case float64:
+        userID = uint(v)
+    case int:
+        userID = uint(v)
+    case uint:
+        userID = v
+    default:
+        return nil, errInvalidUserID
+    }
+
+    result := &authClaims{UserID: userID, ExpiresAt: now.Add(maxTokenCacheTTL)}
+    if exp, ok := claims["exp"].(float64); ok {
+        if expiresAt := time.Unix(int64(exp), 0); expiresAt.Before(result.ExpiresAt) {
+            result.ExpiresAt = expiresAt
+        }
+    }
+    if username, ok := claims["username"].(string); ok {
+        result.Username = username
+    }
+    if role, ok := claims["role"].(string); ok {
+        result.Role = role
+    }
+    return result, nil
+}
+
 func AuthMiddleware() gin.HandlerFunc {
     return func(c *gin.Context) {
         // Ambil Authorization header
         authHeader := c.GetHeader("Authorization")
         if authHeader == "" {
-            log.Println("❌ DEBUG: Header Authorization tidak ada")
             c.JSON(401, gin.H{"error": "Header Authorization diperlukan"})
             c.Abort()
             return
@@ -24,91 +135,44 @@ func AuthMiddleware() gin.HandlerFunc {
         // Ekstrak token dari "Bearer <token>"
         tokenString := strings.TrimPrefix(authHeader, "Bearer ")
         if tokenString == authHeader {
-            log.Println("❌ DEBUG: Format token tidak valid (harus Bearer <token>)")
             c.JSON(401, gin.H{"error": "Format token tidak valid"})
             c.Abort()
             return
         }
-        
-        log.Printf("🔍 DEBUG: Token string: %s...", tokenString[:min(len(tokenString), 20)])
-
-        // Parse dan validasi token
-        token, err := jwt.Parse(tokenString, func(token *jwt.Token) (interface{}, error) {
-            // Pastikan signing method adalah HMAC
-            if _, ok := token.Method.(*jwt.SigningMethodHMAC); !ok {
-                return nil, fmt.Errorf("metode signing tidak dikenali: %v", token.Header["alg"])
-            }
-            return []byte(os.Getenv("JWT_SECRET")), nil
-        })
 
-        if err != nil {
-            log.Printf("❌ DEBUG: Error parse JWT: %v", err)
-            c.JSON(401, gin.H{"error": "Token tidak valid"})
-            c.Abort()
-            return
-        }
-
-        // Ekstrak claims
-        if claims, ok := token.Claims.(jwt.MapClaims); ok && token.Valid {
-            log.Printf("🔍 DEBUG: JWT Claims: %+v", claims)
-            
-            // Ambil user_id dari claims
-            userIDClaim, exists := claims["user_id"]
-            if !exists {
-                log.Println("❌ DEBUG: user_id tidak ada di JWT claims")
+        now := time.Now()
+        claims, cached := claimsCache.get(tokenString, now)
+        if !cached {
+            var err error
+            claims, err = parseToken(tokenString, now)
+            switch {
+            case err == errInvalidUserID:
+                log.Printf("❌ Tipe user_id tidak didukung di JWT")
+                c.JSON(500, gin.H{"error": "Tipe user_id tidak valid"})
+                c.Abort()
+                return
+            case err == errMissingUserID:
                 c.JSON(401, gin.H{"error": "Token tidak valid - user_id hilang"})
                 c.Abort()
                 return
-            }
-            
-            log.Printf("🔍 DEBUG: user_id dari claims: %v (tipe: %T)", userIDClaim, userIDClaim)
-            
-            // Konversi user_id ke uint
-            var userID uint
-            switch v := userIDClaim.(type) {
-            case float64:
-                userID = uint(v)
-                log.Printf("🔍 DEBUG: Konversi float64 ke uint: %d", userID)
-            case int:
-                userID = uint(v)
-                log.Printf("🔍 DEBUG: Konversi int ke uint: %d", userID)
-            case uint:
-                userID = v
-                log.Printf("🔍 DEBUG: user_id sudah uint: %d", userID)
-            default:
-                log.Printf("❌ DEBUG: Tipe user_id tidak didukung: %T", v)
-                c.JSON(500, gin.H{"error": "Tipe user_id tidak valid"})
+            case err != nil:
+                log.Printf("❌ JWT ditolak: %v", err)
+                c.JSON(401, gin.H{"error": "Token tidak valid"})
                 c.Abort()
                 return
             }
-            
-            // Set user_id di context sebagai uint
-            c.Set("user_id", userID)
-            log.Printf("✅ DEBUG: Set user_id di context: %d", userID)
-            
-            // Optional: set claims lain jika diperlukan
-            if username, ok := claims["username"].(string); ok {
-                c.Set("username", username)
-            }
-            if role, ok := claims["role"].(string); ok {
-                c.Set("role", role)
-            }
-            
-        } else {
-            log.Println("❌ DEBUG: Claims JWT tidak valid")
-            c.JSON(401, gin.H{"error": "Token tidak valid"})
-            c.Abort()
-            return
+            claimsCache.put(tokenString, claims, now)
+        }
+
+        // Set user_id di context sebagai uint
+        c.Set("user_id", claims.UserID)
+        if claims.Username != "" {
+            c.Set("username", claims.Username)
+        }
+        if claims.Role != "" {
+            c.Set("role", claims.Role)
         }
 
         c.Next()
     }
 }
-
-// Helper function untuk min
-func min(a, b int) int {
-    if a < b {
-        return a
-    }
-    return b
-}
\ No newline at end of file
@@ -0,0 +1,91 @@
+package middleware
+
+import (
+	"net/http"
+	"net/http/httptest"
+	"testing"
+	"time"
+
+	"github.com/gin-gonic/gin"
+	"github.com/golang-jwt/jwt/v4"
+)
+
+// Dashboard polling memakai token yang sama setiap detik:
+//   go test ./middleware -run '^$' -bench AuthMiddleware -benchmem
+// Cold = setiap request parse + verifikasi HMAC JWT (perilaku lama),
+// Warm = claims diambil dari claimsCache.
+
+const benchSecret = "bench-secret"
+
+func newAuthRouter(tb testing.TB, exp time.Time) (*gin.Engine, *http.Request) {
+	tb.Helper()
+	tb.Setenv("JWT_SECRET", benchSecret)
+	gin.SetMode(gin.ReleaseMode)
+
+	token, err := jwt.NewWithClaims(jwt.SigningMethodHS256, jwt.MapClaims{
+		"user_id":  1,
+		"username": "bench",
+		"role":     "admin",
+		"exp":      exp.Unix(),
+	}).SignedString([]byte(benchSecret))
+	if err != nil {
+		tb.Fatalf("sign token: %v", err)
+	}
+
+	r := gin.New()
+	r.GET("/api/profile", AuthMiddleware(), func(c *gin.Context) {
+		if c.GetUint("user_id") != 1 || c.GetString("role") != "admin" {
+			c.Status(http.StatusInternalServerError)
+			return
+		}
+		c.Status(http.StatusNoContent)
+	})
+
+	req := httptest.NewRequest(http.MethodGet, "/api/profile", nil)
+	req.Header.Set("Authorization", "Bearer "+token)
+	return r, req
+}
+
+func serve(r *gin.Engine, req *http.Request) int {
+	w := httptest.NewRecorder()
+	r.ServeHTTP(w, req)
+	return w.Code
+}
+
+func TestAuthMiddlewareCachedClaims(t *testing.T) {
+	claimsCache.reset()
+	r, req := newAuthRouter(t, time.Now().Add(time.Hour))
+	for i := 0; i < 2; i++ {
+		if code := serve(r, req); code != http.StatusNoContent {
+			t.Fatalf("request %d: status %d, want %d", i, code, http.StatusNoContent)
+		}
+	}
+}
+
+func TestAuthMiddlewareExpiredToken(t *testing.T) {
+	claimsCache.reset()
+	r, req := newAuthRouter(t, time.Now().Add(-time.Minute))
+	if code := serve(r, req); code != http.StatusUnauthorized {
+		t.Fatalf("status %d, want %d", code, http.StatusUnauthorized)
+	}
+}
+
+func benchmarkAuthMiddleware(b *testing.B, warm bool) {
+	r, req := newAuthRouter(b, time.Now().Add(time.Hour))
+	claimsCache.reset()
+	serve(r, req)
+	b.ReportAllocs()
+	b.ResetTimer()
+	for i := 0; i < b.N; i++ {
+		if !warm {
+			claimsCache.reset()
+		}
+		if code := serve(r, req); code != http.StatusNoContent {
+			b.Fatalf("status %d", code)
+		}
+	}
+}
+
+func BenchmarkAuthMiddlewareColdCache(b *testing.B) { benchmarkAuthMiddleware(b, false) }
+
+func BenchmarkAuthMiddlewareWarmCache(b *testing.B) { benchmarkAuthMiddleware(b, true) }
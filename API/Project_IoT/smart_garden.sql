@@ -36,6 +36,8 @@ CREATE TABLE `devices` (
   `mac_address` varchar(17) DEFAULT NULL,
   `firmware_version` varchar(20) DEFAULT NULL,
   `is_active` tinyint(1) DEFAULT '1',
+  `auto_mode` tinyint(1) DEFAULT '1',
+  `last_command` varchar(50) DEFAULT NULL,
   `last_seen` timestamp NULL DEFAULT NULL,
   `user_id` int NOT NULL,
   `created_at` timestamp NULL DEFAULT CURRENT_TIMESTAMP,
@@ -47,9 +49,9 @@ CREATE TABLE `devices` (
 -- Dumping data untuk tabel `devices`
 --
 
-INSERT INTO `devices` (`id`, `device_name`, `device_type`, `location`, `ip_address`, `mac_address`, `firmware_version`, `is_active`, `last_seen`, `user_id`, `created_at`, `updated_at`, `deleted_at`) VALUES
-(1, 'Smart Irrigation Device 1', 'irrigation', 'Garden Rumah', '192.168.39.89', NULL, NULL, 1, NULL, 1, '2025-06-15 12:29:45', '2025-06-15 12:29:45', NULL),
-(4, 'Smart Garden Iot', 'irrigation', 'Depan rumah', '192.168.39.89', NULL, NULL, 1, NULL, 4, '2025-06-18 13:15:54', '2025-06-19 12:38:34', NULL);
+INSERT INTO `devices` (`id`, `device_name`, `device_type`, `location`, `ip_address`, `mac_address`, `firmware_version`, `is_active`, `auto_mode`, `last_command`, `last_seen`, `user_id`, `created_at`, `updated_at`, `deleted_at`) VALUES
+(1, 'Smart Irrigation Device 1', 'irrigation', 'Garden Rumah', '192.168.39.89', NULL, NULL, 1, 1, NULL, NULL, 1, '2025-06-15 12:29:45', '2025-06-15 12:29:45', NULL),
+(4, 'Smart Garden Iot', 'irrigation', 'Depan rumah', '192.168.39.89', NULL, NULL, 1, 1, NULL, NULL, 4, '2025-06-18 13:15:54', '2025-06-19 12:38:34', NULL);
 
 -- --------------------------------------------------------
 
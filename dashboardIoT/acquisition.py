@@ -0,0 +1,250 @@
+"""
+Out-of-process data acquisition for the dashboard.
+
+Polling, JSON decoding and storage run in a child process so they never
+compete with Tk's main loop for the GIL. Readings are written as fixed-layout
+records into a multiprocessing.shared_memory ring buffer; a Pipe carries
+one-byte notifications to the UI and small control messages back.
+
+Shared memory layout:
+    header (64 bytes): write_seq, capacity, record_size  (uint64 each)
+    records:           capacity * record_size bytes
+Each record is framed by its sequence number at the start and the end, so a
+reader can detect a slot that was overwritten while it was being copied.
+"""
+import math
+import multiprocessing
+import struct
+import time
+from multiprocessing import shared_memory
+
+from sensor_reading import SENSOR_SCHEMA, SensorReading, decode_reading
+
+# Notifications (child -> UI)
+MSG_READING = b"R"
+MSG_OFFLINE = b"E"
+MSG_AUTH_EXPIRED = b"A"
+# Control messages (UI -> child)
+CTRL_BOOST = "boost"
+CTRL_VISIBILITY = "visibility"
+CTRL_PAUSE = "pause"
+CTRL_RESUME = "resume"
+CTRL_STOP = "stop"
+
+INT_NONE = -(2 ** 63)
+# Fixed byte widths for text fields; longer values are truncated.
+# logic_explanation is free text and is not carried over shared memory.
+TEXT_WIDTHS = {"temperature_source": 8, "humidity_source": 8, "pump_status": 12, "system_status": 32}
+
+HEADER = struct.Struct("<QQQ")
+HEADER_SIZE = 64
+
+
+def _build_layout():
+    fields, codes = [], []
+    for field, field_type, _ in SENSOR_SCHEMA:
+        if field_type is str:
+            if field not in TEXT_WIDTHS:
+                continue
+            codes.append(f"{TEXT_WIDTHS[field]}s")
+        elif field_type is int:
+            codes.append("q")
+        else:  # float, timestamps (epoch seconds)
+            codes.append("d")
+        fields.append((field, field_type))
+    return tuple(fields), struct.Struct("<Q" + "".join(codes) + "Q")
+
+RECORD_FIELDS, RECORD = _build_layout()
+
+
+def pack_values(reading):
+    values = []
+    for field, field_type in RECORD_FIELDS:
+        value = getattr(reading, field)
+        if field_type is str:
+            values.append(b"" if value is None else value.encode("utf-8")[:TEXT_WIDTHS[field]])
+        elif field_type is int:
+            values.append(INT_NONE if value is None else value)
+        else:
+            values.append(math.nan if value is None else value)
+    return values
+
+def unpack_reading(values):
+    reading = object.__new__(SensorReading)
+    for slot in SensorReading.__slots__:
+        setattr(reading, slot, None)
+    for (field, field_type), value in zip(RECORD_FIELDS, values):
+        if field_type is str:
+            value = value.rstrip(b"\0").decode("utf-8", "replace") or None
+        elif field_type is int:
+            value = None if value == INT_NONE else value
+        elif value != value:  # NaN
+            value = None
+        setattr(reading, field, value)
+    return reading
+
+
+class RingWriter:
+    """Single-producer side of the ring buffer (lives in the acquisition process)."""
+    def __init__(self, name):
+        self.shm = shared_memory.SharedMemory(name=name)
+        self.buf = self.shm.buf
+        self.seq, self.capacity, record_size = HEADER.unpack_from(self.buf, 0)
+        if record_size != RECORD.size:
+            raise ValueError("Shared memory record layout mismatch")
+
+    def write(self, reading):
+        seq = self.seq + 1
+        offset = HEADER_SIZE + (seq % self.capacity) * RECORD.size
+        RECORD.pack_into(self.buf, offset, seq, *pack_values(reading), seq)
+        # Publish only after the record is complete
+        struct.pack_into("<Q", self.buf, 0, seq)
+        self.seq = seq
+        return seq
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+
+
+class RingReader:
+    """Consumer side; the UI creates (and finally unlinks) the shared memory."""
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.shm = shared_memory.SharedMemory(create=True, size=HEADER_SIZE + capacity * RECORD.size)
+        HEADER.pack_into(self.shm.buf, 0, 0, capacity, RECORD.size)
+        self.name = self.shm.name
+        self.last_seq = 0
+
+    @property
+    def write_seq(self):
+        return struct.unpack_from("<Q", self.shm.buf, 0)[0]
+
+    def read_newest(self, limit=1):
+        """Return up to `limit` unseen readings, oldest first; older unseen records are skipped."""
+        head = self.write_seq
+        if head <= self.last_seq:
+            return []
+        first = max(self.last_seq + 1, head - min(limit, self.capacity) + 1)
+        readings = []
+        buf = self.shm.buf
+        for seq in range(first, head + 1):
+            values = RECORD.unpack_from(buf, HEADER_SIZE + (seq % self.capacity) * RECORD.size)
+            if values[0] != seq or values[-1] != seq:
+                continue  # overwritten while reading
+            readings.append(unpack_reading(values[1:-1]))
+        self.last_seq = head
+        return readings
+
+    def close(self):
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def acquisition_main(shm_name, conn, sensor_endpoint, auth_token, request_timeout, refresh_interval):
+    """Child process entry point: poll, decode, write to the ring, notify the UI."""
+    import requests
+    from poll_scheduler import AdaptivePollScheduler
+
+    writer = RingWriter(shm_name)
+    scheduler = AdaptivePollScheduler(base_interval=refresh_interval)
+    session = requests.Session()
+    session.headers['Authorization'] = f'Bearer {auth_token}'
+    last_key = None
+    paused = False
+    try:
+        while True:
+            if not paused:
+                try:
+                    response = session.get(sensor_endpoint, timeout=request_timeout)
+                    if response.status_code == 200:
+                        data = response.json()
+                        reading = decode_reading(data.get('data', data))
+                        scheduler.on_reading(reading.server_timestamp, time.time())
+                        key = (reading.id, reading.server_timestamp)
+                        # Only store/notify when the device actually posted something new
+                        if key != last_key:
+                            last_key = key
+                            writer.write(reading)
+                            conn.send_bytes(MSG_READING)
+                    elif response.status_code == 401:
+                        conn.send_bytes(MSG_AUTH_EXPIRED)
+                        paused = True
+                    else:
+                        if response.status_code >= 500: scheduler.on_failure()
+                        conn.send_bytes(MSG_OFFLINE)
+                except requests.exceptions.RequestException:
+                    scheduler.on_failure()
+                    conn.send_bytes(MSG_OFFLINE)
+                except ValueError:
+                    conn.send_bytes(MSG_OFFLINE)
+
+            # Sleep until the next poll is due, waking early for control messages
+            deadline = time.time() + scheduler.next_delay(time.time())
+            while True:
+                timeout = None if paused else max(0.0, deadline - time.time())
+                if not conn.poll(timeout):
+                    break
+                message, arg = conn.recv()
+                if message == CTRL_STOP:
+                    return
+                if message == CTRL_PAUSE:
+                    paused = True
+                elif message == CTRL_RESUME:
+                    paused = False
+                    break
+                elif message == CTRL_BOOST:
+                    scheduler.on_command(time.time())
+                    deadline = min(deadline, time.time() + scheduler.min_interval)
+                elif message == CTRL_VISIBILITY:
+                    scheduler.set_visibility(arg)
+    except (EOFError, BrokenPipeError, KeyboardInterrupt):
+        pass
+    finally:
+        session.close()
+        writer.close()
+
+
+class AcquisitionProcess:
+    """UI-side handle: owns the ring buffer, the pipe and the child process."""
+    def __init__(self, sensor_endpoint, auth_token, request_timeout, refresh_interval, capacity=256):
+        self.ring = RingReader(capacity)
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=acquisition_main, name="smart-garden-acquisition", daemon=True,
+            args=(self.ring.name, child_conn, sensor_endpoint, auth_token, request_timeout, refresh_interval),
+        )
+        self.process.start()
+        child_conn.close()
+
+    def send(self, message, arg=None):
+        try:
+            self.conn.send((message, arg))
+        except (BrokenPipeError, OSError):
+            pass
+
+    def drain(self, limit=1):
+        """
+        Non-blocking: consume pending notifications and return
+        (newest readings, set of other notification codes).
+        """
+        notices = set()
+        try:
+            while self.conn.poll():
+                notices.add(self.conn.recv_bytes())
+        except (EOFError, OSError):
+            notices.add(MSG_OFFLINE)
+        readings = self.ring.read_newest(limit) if MSG_READING in notices else []
+        notices.discard(MSG_READING)
+        return readings, notices
+
+    def stop(self):
+        self.send(CTRL_STOP)
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+        self.ring.close()
@@ -0,0 +1,144 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Per-device result states, in the order they normally progress
+STATE_PENDING = "pending"
+STATE_SENT = "sent"        # API accepted the command, waiting for the ESP32 ack
+STATE_ACKED = "acked"      # ESP32 executed it (last_command cleared)
+STATE_NO_ACK = "no_ack"    # accepted, but no ack within ack_timeout
+STATE_FAILED = "failed"
+
+
+def fetch_devices(api_base_url, auth_token, request_timeout):
+    """GET /api/devices -> list of device dicts (raises requests exceptions)."""
+    headers = {'Authorization': f'Bearer {auth_token}'}
+    response = requests.get(f"{api_base_url}/api/devices", headers=headers, timeout=request_timeout)
+    response.raise_for_status()
+    data = response.json()
+    return data.get('devices', data if isinstance(data, list) else [])
+
+
+class BulkCommandRunner:
+    """
+    Sends one command (PUMP_OFF, AUTO_ON, ...) to many devices concurrently
+    through a thread pool sized to the group (up to max_workers), so a whole
+    selection goes out in one wave, with per-device timeout and retry.
+
+    Ack tracking is opt-in (wait_for_ack=True): the shipped firmware
+    (ESP32_Code/ProjectIot.ino) never calls /command-ack, so last_command is
+    never cleared and every device would end up "no ack". Enable it once the
+    firmware acknowledges commands.
+
+    on_update(device_id, state, detail) is called from worker threads; UI
+    callers should hop to the Tk thread themselves (widget.after(0, ...)).
+    """
+    def __init__(self, api_base_url, auth_token, request_timeout, max_workers=128,
+                 retries=2, retry_delay=0.5, ack_timeout=20.0, ack_poll_interval=2.0):
+        self.api_base_url = api_base_url
+        self.request_timeout = request_timeout
+        self.max_workers = max_workers
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.ack_timeout = ack_timeout
+        self.ack_poll_interval = ack_poll_interval
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers['Authorization'] = f'Bearer {auth_token}'
+        self.cancelled = threading.Event()
+
+    def run(self, device_ids, command, on_update, on_done=None, wait_for_ack=False):
+        """
+        Dispatch in the background; returns immediately. on_done(results) runs
+        as soon as every send has finished; with wait_for_ack the ack polling
+        follows as a separate phase reported through on_update only (close()
+        stops it).
+        """
+        def dispatch():
+            results = {}
+            workers = min(self.max_workers, max(len(device_ids), 1))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bulk-command") as pool:
+                futures = {device_id: pool.submit(self._send, device_id, command, on_update)
+                           for device_id in device_ids}
+                for device_id, future in futures.items():
+                    try:
+                        results[device_id] = future.result()
+                    except Exception as e:
+                        results[device_id] = STATE_FAILED
+                        on_update(device_id, STATE_FAILED, str(e))
+            if on_done: on_done(results)
+            if wait_for_ack:
+                sent = [device_id for device_id, state in results.items() if state == STATE_SENT]
+                self._wait_for_acks(sent, on_update)
+
+        for device_id in device_ids:
+            on_update(device_id, STATE_PENDING, "")
+        threading.Thread(target=dispatch, daemon=True).start()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def _send(self, device_id, command, on_update):
+        url = f"{self.api_base_url}/api/devices/{device_id}/command"
+        detail = ""
+        for attempt in range(self.retries + 1):
+            if self.cancelled.is_set():
+                on_update(device_id, STATE_FAILED, "cancelled")
+                return STATE_FAILED
+            try:
+                response = self.session.put(url, json={"command": command}, timeout=self.request_timeout)
+                if response.status_code == 200:
+                    on_update(device_id, STATE_SENT, "")
+                    return STATE_SENT
+                try:
+                    detail = f"{response.json().get('error', 'Unknown error')} ({response.status_code})"
+                except ValueError:
+                    detail = f"HTTP {response.status_code}"
+                # 4xx won't succeed on retry (bad id, permission denied, ...)
+                if response.status_code < 500:
+                    break
+            except requests.exceptions.RequestException as e:
+                detail = f"Connection error: {e.__class__.__name__}"
+            if attempt < self.retries:
+                time.sleep(self.retry_delay * (2 ** attempt))
+        on_update(device_id, STATE_FAILED, detail)
+        return STATE_FAILED
+
+    def _wait_for_acks(self, device_ids, on_update):
+        """
+        The ESP32 clears last_command via /command-ack once it has executed the
+        command. One GET /api/devices per interval covers the whole group.
+        """
+        waiting = set(device_ids)
+        results = {}
+        deadline = time.time() + self.ack_timeout
+        while waiting and time.time() < deadline and not self.cancelled.is_set():
+            time.sleep(self.ack_poll_interval)
+            try:
+                response = self.session.get(f"{self.api_base_url}/api/devices", timeout=self.request_timeout)
+                if response.status_code != 200:
+                    continue
+                data = response.json()
+                devices = data.get('devices', data if isinstance(data, list) else [])
+            except (requests.exceptions.RequestException, ValueError):
+                continue
+            for device in devices:
+                device_id = device.get('id')
+                if device_id in waiting and not device.get('last_command'):
+                    waiting.discard(device_id)
+                    results[device_id] = STATE_ACKED
+                    on_update(device_id, STATE_ACKED, "")
+        for device_id in waiting:
+            results[device_id] = STATE_NO_ACK
+            on_update(device_id, STATE_NO_ACK, "")
+        return results
+
+    def close(self):
+        self.cancel()
+        self.session.close()
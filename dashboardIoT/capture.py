@@ -0,0 +1,227 @@
+"""
+Append-only capture files for dashboard record & replay.
+
+File layout (<name>.sgcap):
+    magic b"SGCAP1\\n", then records of
+    [u32 length][u8 kind][f64 timestamp][JSON payload]   (length = 9 + payload)
+Sparse index (<name>.sgcap.idx): fixed [f64 timestamp][u64 offset] entries,
+written every `index_interval` seconds. Each indexed offset starts with a
+keyframe (the current device state and latest reading), so playback can
+start at any index entry without scanning from the beginning.
+
+Usage:
+    python capture.py info  <file.sgcap>
+    python capture.py bench <file.sgcap>   # network-free decode/health/state benchmark
+"""
+import bisect
+import json
+import os
+import struct
+import sys
+import time
+
+MAGIC = b"SGCAP1\n"
+RECORD_HEAD = struct.Struct("<IBd")
+INDEX_ENTRY = struct.Struct("<dQ")
+
+KIND_READING = 1
+KIND_DEVICE = 2
+KIND_COMMAND = 3
+KIND_NAMES = {KIND_READING: "reading", KIND_DEVICE: "device", KIND_COMMAND: "command"}
+
+
+class CaptureWriter:
+    def __init__(self, path, index_interval=60.0):
+        self.path = path
+        self.index_interval = index_interval
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, "ab")
+        self.index_file = open(path + ".idx", "ab")
+        if new_file:
+            self.file.write(MAGIC)
+        self.next_index_at = 0.0
+        self.last_device = None
+        self.last_reading = None
+
+    def _append(self, kind, payload, ts):
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        self.file.write(RECORD_HEAD.pack(9 + len(body), kind, ts) + body)
+
+    def write(self, kind, payload, ts=None):
+        ts = time.time() if ts is None else ts
+        if ts >= self.next_index_at:
+            # Keyframe: index entry + current state, so a seek never needs older data
+            self.next_index_at = ts + self.index_interval
+            self.index_file.write(INDEX_ENTRY.pack(ts, self.file.tell()))
+            self.index_file.flush()
+            if kind != KIND_DEVICE and self.last_device is not None:
+                self._append(KIND_DEVICE, self.last_device, ts)
+            if kind != KIND_READING and self.last_reading is not None:
+                self._append(KIND_READING, self.last_reading, ts)
+        if kind == KIND_DEVICE:
+            self.last_device = payload
+        elif kind == KIND_READING:
+            self.last_reading = payload
+        self._append(kind, payload, ts)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+        self.index_file.close()
+
+
+class CaptureReader:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        if self.file.read(len(MAGIC)) != MAGIC:
+            self.file.close()
+            raise ValueError(f"{path} is not a Smart Garden capture file")
+        self.index_ts, self.index_offsets = self._load_index()
+
+    def _load_index(self):
+        timestamps, offsets = [], []
+        try:
+            with open(self.path + ".idx", "rb") as f:
+                data = f.read()
+            usable = len(data) - len(data) % INDEX_ENTRY.size
+            for ts, offset in INDEX_ENTRY.iter_unpack(data[:usable]):
+                timestamps.append(ts)
+                offsets.append(offset)
+        except FileNotFoundError:
+            pass
+        if not offsets:
+            timestamps, offsets = [0.0], [len(MAGIC)]
+        return timestamps, offsets
+
+    @property
+    def start_time(self):
+        for _, ts, _ in self.records():
+            return ts
+        return None
+
+    def records(self, start_ts=None):
+        """Yield (kind, ts, payload) from the keyframe at or before start_ts onwards."""
+        offset = len(MAGIC)
+        if start_ts is not None:
+            i = bisect.bisect_right(self.index_ts, start_ts) - 1
+            offset = self.index_offsets[max(i, 0)]
+        self.file.seek(offset)
+        read = self.file.read
+        while True:
+            head = read(RECORD_HEAD.size)
+            if len(head) < RECORD_HEAD.size:
+                return
+            length, kind, ts = RECORD_HEAD.unpack(head)
+            body = read(length - 9)
+            if len(body) < length - 9:
+                return  # truncated tail (recorder still writing / crashed)
+            yield kind, ts, json.loads(body)
+
+    def close(self):
+        self.file.close()
+
+
+class CapturePlayer:
+    """
+    Replays a capture through callbacks at 1x-1000x using a Tk-style
+    schedule(delay_ms, fn) function. Records before the requested start time
+    (from the keyframe) are applied immediately so the state is correct.
+    """
+    def __init__(self, path, schedule, on_reading, on_device, on_command=None, on_finished=None):
+        self.reader = CaptureReader(path)
+        self.schedule = schedule
+        self.handlers = {KIND_READING: on_reading, KIND_DEVICE: on_device, KIND_COMMAND: on_command}
+        self.on_finished = on_finished
+        self.running = False
+        self.position = None
+
+    def play(self, start_ts=None, speed=1.0):
+        self.speed = min(max(float(speed), 1.0), 1000.0)
+        self.records = self.reader.records(start_ts)
+        self.running = True
+        latest = {}
+        for kind, ts, payload in self.records:
+            if start_ts is None or ts >= start_ts:
+                self.pending = (kind, ts, payload)
+                break
+            latest[kind] = payload  # fast-forward: only the newest state matters
+        else:
+            self.pending = None
+        for kind in (KIND_DEVICE, KIND_READING):
+            if kind in latest:
+                self.handlers[kind](latest[kind])
+        self._step()
+
+    def _step(self):
+        if not self.running:
+            return
+        if self.pending is None:
+            self.stop()
+            if self.on_finished: self.on_finished()
+            return
+        kind, ts, payload = self.pending
+        self.position = ts
+        handler = self.handlers.get(kind)
+        if handler: handler(payload)
+        self.pending = next(self.records, None)
+        if self.pending is not None:
+            delay_ms = max(0, int((self.pending[1] - ts) * 1000 / self.speed))
+            self.schedule(delay_ms, self._step)
+        else:
+            self.schedule(0, self._step)
+
+    def stop(self):
+        self.running = False
+
+    def close(self):
+        self.stop()
+        self.reader.close()
+
+
+def _info(path):
+    reader = CaptureReader(path)
+    counts, first, last = {}, None, None
+    for kind, ts, _ in reader.records():
+        counts[KIND_NAMES.get(kind, kind)] = counts.get(KIND_NAMES.get(kind, kind), 0) + 1
+        first = ts if first is None else first
+        last = ts
+    reader.close()
+    print(f"{path}: {counts}, {len(reader.index_ts)} index entries")
+    if first is not None:
+        fmt = "%Y-%m-%d %H:%M:%S"
+        print(f"  {time.strftime(fmt, time.localtime(first))} .. {time.strftime(fmt, time.localtime(last))}")
+
+def _bench(path):
+    from sensor_reading import decode_reading
+    from sensor_health import HealthMonitor
+    from state_store import StateStore
+
+    reader = CaptureReader(path)
+    payloads = [payload for kind, _, payload in reader.records() if kind == KIND_READING]
+    reader.close()
+    if not payloads:
+        print("No readings in capture."); return
+    queue = []
+    store = StateStore(lambda delay, fn: queue.append(fn))
+    for field in ("temperature", "humidity", "soil_moisture_percent", "water_percentage", "pump_status", "system_status"):
+        store.subscribe((field,), lambda value: None)
+    monitor = HealthMonitor()
+    start = time.perf_counter()
+    for payload in payloads:
+        reading = decode_reading(payload)
+        store.update({"temperature": reading.temperature, "humidity": reading.humidity,
+                      "soil_moisture_percent": reading.soil_moisture_percent,
+                      "water_percentage": reading.water_percentage, "pump_status": reading.pump_status,
+                      "system_status": reading.system_status, "health_issues": monitor.update(reading)})
+        while queue: queue.pop()()
+    elapsed = time.perf_counter() - start
+    print(f"{len(payloads)} readings: {elapsed * 1e6 / len(payloads):.1f} us/reading (decode + health + state diff)")
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] not in ("info", "bench"):
+        print(__doc__.strip().split("Usage:")[1]); sys.exit(1)
+    (_info if sys.argv[1] == "info" else _bench)(sys.argv[2])
@@ -4,13 +4,23 @@ import threading
 import time
 from datetime import datetime
 import math
+from sensor_reading import decode_reading
+from state_store import StateStore
+from poll_scheduler import AdaptivePollScheduler
+from sensor_health import HealthMonitor
+from forecaster import Forecaster
+from capture import CaptureWriter, CapturePlayer, KIND_READING, KIND_DEVICE, KIND_COMMAND
+from bulk_commands import BulkCommandRunner, fetch_devices, STATE_PENDING, STATE_SENT, STATE_ACKED, STATE_NO_ACK, STATE_FAILED
+from acquisition import AcquisitionProcess, MSG_OFFLINE, MSG_AUTH_EXPIRED, CTRL_BOOST, CTRL_VISIBILITY, CTRL_PAUSE, CTRL_RESUME
 
 class DashboardApp(ctk.CTk):
     """
     An ultra-modern dashboard for a Smart Garden device, featuring animated gauges,
     a glassmorphism design, and interactive elements.
     """
-    def __init__(self, auth_token, user_data, api_endpoint, request_timeout, refresh_interval, device_id=4):
+    FRAME_MS = 16
+
+    def __init__(self, auth_token, user_data, api_endpoint, request_timeout, refresh_interval, device_id=4, acquisition_mode="thread", capture_path=None):
         super().__init__()
         
         # --- Core Parameters ---
@@ -21,10 +31,35 @@ class DashboardApp(ctk.CTk):
         self.request_timeout = request_timeout
         self.refresh_interval = refresh_interval
         self.device_id = device_id
+        # "thread": poll from worker threads; "process": poll/decode in a child process
+        # and read readings from a shared-memory ring buffer once per frame
+        self.acquisition_mode = acquisition_mode
+        self.acquisition = None
+        self._drain_job = None
+        # Record & replay: every new snapshot/command is appended to capture_path (if set)
+        self.capture_path = capture_path
+        self.recorder = CaptureWriter(capture_path) if capture_path else None
+        self.player = None
+        self._live_context = None  # live analytics/state saved while a replay runs
+        self._last_recorded_key = None
+        self._last_recorded_device = None
         
         # --- State Variables ---
         self.auto_refresh_enabled = False
         self.device_info = {}
+        # Observable UI state; widgets subscribe to the fields they render
+        self.ui_state = StateStore(self.after, on_error=lambda callback, e: self.log(
+            "UI_ERROR", f"{getattr(callback, '__name__', callback)} failed: {e}"))
+        # Adaptive polling: cadence-aligned, backs off on errors, slows when not visible
+        self.poll_scheduler = AdaptivePollScheduler(base_interval=self.refresh_interval)
+        self.device_info_interval = 5
+        self._poll_job = None
+        self._poll_in_flight = False
+        self._last_device_info_poll = 0.0
+        # Streaming per-device health analytics (flatline, heap leak, reboots, RSSI)
+        self.health_monitor = HealthMonitor()
+        # Online (RLS) tank-depletion and next-watering forecasts per device
+        self.forecaster = Forecaster()
         
         # --- Role-based Access ---
         user_details = self.user_data.get('user', self.user_data)
@@ -56,6 +91,8 @@ class DashboardApp(ctk.CTk):
 
         # --- Initial Setup ---
         self.setup_ui()
+        for sequence in ("<Map>", "<Unmap>", "<FocusIn>", "<FocusOut>"):
+            self.bind(sequence, self._on_visibility_event, add="+")
         self.fetch_device_info()
         self.start_auto_refresh()
 
@@ -96,9 +133,16 @@ class DashboardApp(ctk.CTk):
         
         if self.is_admin:
             ctk.CTkButton(sidebar, text="  Manage Users", anchor="w", font=self.FONT_NORMAL, command=self.show_users_window, image=self._get_icon("👥")).pack(fill="x", padx=15, pady=6)
+        ctk.CTkButton(sidebar, text="  Group Command", anchor="w", font=self.FONT_NORMAL, command=self.show_group_command_window, image=self._get_icon("📡")).pack(fill="x", padx=15, pady=6)
+        ctk.CTkButton(sidebar, text="  Replay Capture", anchor="w", font=self.FONT_NORMAL, command=self.show_replay_dialog, image=self._get_icon("⏪")).pack(fill="x", padx=15, pady=6)
         
         ctk.CTkButton(sidebar, text="  Logout", anchor="w", fg_color="#982D2D", hover_color="#C62828", command=self.logout, image=self._get_icon("🚪")).pack(fill="x", padx=15, pady=20, side="bottom")
 
+        ctk.CTkLabel(sidebar, text="DEVICE HEALTH", font=("Roboto", 10, "bold"), text_color=self.COLOR_TEXT_SECONDARY).pack(fill="x", padx=20, pady=(20, 5))
+        self.health_label = ctk.CTkLabel(sidebar, text="⚫ Menunggu data...", font=("Roboto", 10), text_color=self.COLOR_TEXT_SECONDARY, justify="left", anchor="w", wraplength=185)
+        self.health_label.pack(fill="x", padx=20)
+        self.ui_state.subscribe(("health_issues",), self.update_health_panel)
+
         self.auto_var = ctk.BooleanVar(value=True)
         ctk.CTkCheckBox(sidebar, text="Auto Refresh", variable=self.auto_var, command=self.toggle_auto).pack(fill="x", padx=15, pady=10, side="bottom")
         
@@ -121,6 +165,13 @@ class DashboardApp(ctk.CTk):
 
         self.auto_mode_label = ctk.CTkLabel(title_status_frame, text="⚫ LOADING MODE", font=("Roboto", 10, "bold"), text_color="gray")
         self.auto_mode_label.pack(side="left", anchor="w", padx=10)
+
+        self.connection_label = ctk.CTkLabel(title_status_frame, text="⚫ CONNECTING", font=("Roboto", 10, "bold"), text_color="gray")
+        self.connection_label.pack(side="left", anchor="w")
+
+        self.ui_state.subscribe(("device_name",), self.update_device_name)
+        self.ui_state.subscribe(("auto_mode",), self.update_auto_mode_status)
+        self.ui_state.subscribe(("connection",), self.update_connection_status)
         
         date_frame = ctk.CTkFrame(header_frame, fg_color="transparent")
         date_frame.grid(row=0, column=1, rowspan=2, sticky="e")
@@ -134,21 +185,21 @@ class DashboardApp(ctk.CTk):
         self.sensor_frame.grid_rowconfigure((0, 1), weight=1)
         
         sensors = [
-            {"icon": "🌡️", "name": "Suhu", "keys": ["temperature"], "unit": "°C", "color": ["#29B6F6", "#0288D1"], "gauge": True},
-            {"icon": "💧", "name": "Kelembapan", "keys": ["humidity"], "unit": "%", "color": ["#66BB6A", "#388E3C"], "gauge": True},
-            {"icon": "🌱", "name": "Kelembapan Tanah", "keys": ["soil_moisture_percent", "soil_moisture"], "unit": "%", "color": ["#8D6E63", "#5D4037"], "gauge": True},
-            {"icon": "🚰", "name": "Level Air", "keys": ["water_percentage", "water_level"], "unit": "%", "color": ["#42A5F5", "#1976D2"], "gauge": True},
-            {"icon": "⚡", "name": "Status Pompa", "keys": ["pump_status"], "unit": "", "color": ["#FFA726", "#F57C00"]},
-            {"icon": "🔧", "name": "Status Sistem", "keys": ["system_status"], "unit": "", "color": ["#AB47BC", "#8E24AA"]},
+            {"icon": "🌡️", "name": "Suhu", "field": "temperature", "unit": "°C", "color": ["#29B6F6", "#0288D1"], "gauge": True},
+            {"icon": "💧", "name": "Kelembapan", "field": "humidity", "unit": "%", "color": ["#66BB6A", "#388E3C"], "gauge": True},
+            {"icon": "🌱", "name": "Kelembapan Tanah", "field": "soil_moisture_percent", "unit": "%", "color": ["#8D6E63", "#5D4037"], "gauge": True, "forecast": True},
+            {"icon": "🚰", "name": "Level Air", "field": "water_percentage", "unit": "%", "color": ["#42A5F5", "#1976D2"], "gauge": True, "forecast": True},
+            {"icon": "⚡", "name": "Status Pompa", "field": "pump_status", "unit": "", "color": ["#FFA726", "#F57C00"]},
+            {"icon": "🔧", "name": "Status Sistem", "field": "system_status", "unit": "", "color": ["#AB47BC", "#8E24AA"]},
         ]
         
         self.sensor_cards = {}
         for i, config in enumerate(sensors):
             row, col = divmod(i, 3)
-            primary_key = config['keys'][0]
             card = self._create_sensor_card(self.sensor_frame, config)
             card['frame'].grid(row=row, column=col, padx=10, pady=10, sticky="nsew")
-            self.sensor_cards[primary_key] = card
+            self.sensor_cards[config['field']] = card
+            self.ui_state.subscribe((config['field'],), lambda value, card=card: self._render_card(card, value))
 
     def _create_sensor_card(self, parent, config):
         card_frame = ctk.CTkFrame(parent, fg_color=self.COLOR_CARD_BG, corner_radius=15, border_width=1, border_color=self.COLOR_CARD_BORDER)
@@ -160,7 +211,7 @@ class DashboardApp(ctk.CTk):
         value_frame = ctk.CTkFrame(card_frame, fg_color="transparent")
         value_frame.grid(row=1, column=0, sticky="nsew", pady=10)
 
-        card_widgets = {"frame": card_frame, "keys": config['keys'], "unit": config['unit'], "value_label": None, "canvas": None, "colors": config['color']}
+        card_widgets = {"frame": card_frame, "field": config['field'], "unit": config['unit'], "value_label": None, "canvas": None, "colors": config['color']}
 
         if config.get("gauge"):
             canvas = ctk.CTkCanvas(value_frame, width=150, height=150, bg=self.COLOR_CARD_BG, highlightthickness=0)
@@ -172,6 +223,11 @@ class DashboardApp(ctk.CTk):
             value_label.pack(expand=True)
             card_widgets['value_label'] = value_label
 
+        if config.get("forecast"):
+            forecast_label = ctk.CTkLabel(card_frame, text="⏳ Menghitung perkiraan...", font=("Roboto", 11), text_color=self.COLOR_TEXT_SECONDARY)
+            forecast_label.grid(row=2, column=0, pady=(0, 12), padx=15, sticky="w")
+            self.ui_state.subscribe((f"forecast_{config['field']}",), lambda text: forecast_label.configure(text=text))
+
         original_border_color = self.COLOR_CARD_BORDER
         def on_enter(e): card_frame.configure(border_color=config['color'][0])
         def on_leave(e): card_frame.configure(border_color=original_border_color)
@@ -186,12 +242,13 @@ class DashboardApp(ctk.CTk):
         w, h = 150, 150
         start_angle, full_angle = 140, 260
         
-        try:
-            percent = min(max(float(value) / 100.0, 0.0), 1.0)
-            display_value = f"{float(value):.1f}"
-        except (ValueError, TypeError):
+        # value is already a float (or None) from the SensorReading decoder
+        if value is None:
             percent = 0.0
             display_value = "--"
+        else:
+            percent = min(max(value / 100.0, 0.0), 1.0)
+            display_value = f"{value:.1f}"
             
         value_label.configure(text=display_value)
         value_label.place(relx=0.5, rely=0.5, anchor="center")
@@ -218,6 +275,8 @@ class DashboardApp(ctk.CTk):
         self.auto_mode_btn = ctk.CTkButton(self.control_frame, text="Set AUTO", command=lambda: self.send_device_command("AUTO_ON"), fg_color="#2196F3", hover_color="#64B5F6", height=40)
         self.auto_mode_btn.grid(row=1, column=2, padx=10, pady=10, sticky="ew")
 
+        self.ui_state.subscribe(("command_pending",), self.update_control_buttons_state)
+
     def create_log(self):
         log_container = ctk.CTkFrame(self.bottom_frame, fg_color="transparent")
         log_container.grid(row=0, column=1, sticky="nsew", padx=(10, 0))
@@ -228,29 +287,46 @@ class DashboardApp(ctk.CTk):
         self.log_text.pack(fill="both", expand=True, pady=5)
         self.log("System", "Dashboard UI Initialized.")
 
-    def update_display(self, data):
-        self.log("UI_DEBUG", f"Updating display with data: {str(data)[:200]}")
-        for card in self.sensor_cards.values():
-            if not card['frame'].winfo_exists(): continue
+    def update_display(self, reading):
+        """Push a new reading into the state store; only cards whose value changed are redrawn."""
+        if self.recorder and self.player is None:
+            key = (reading.id, reading.server_timestamp)
+            if key != self._last_recorded_key:
+                self._last_recorded_key = key
+                self.recorder.write(KIND_READING, reading.as_dict())
+        changes = {field: getattr(reading, field) for field in self.sensor_cards}
+        changes["health_issues"] = self.health_monitor.update(reading)
+        forecast = self.forecaster.update(reading)
+        # Formatted to minutes, so the labels are only touched when the text changes
+        changes["forecast_water_percentage"] = f"⏳ Habis dalam: {self._format_eta(forecast.time_to_empty())}"
+        if forecast.pumping:
+            changes["forecast_soil_moisture_percent"] = "💧 Sedang menyiram"
+        else:
+            changes["forecast_soil_moisture_percent"] = f"💧 Siram berikutnya: {self._format_eta(forecast.time_to_next_watering())}"
+        self.ui_state.update(changes)
 
-            value = '--'
-            for key in card['keys']:
-                if key in data:
-                    value = data[key]
-                    break
-            
-            try:
-                if card.get("canvas"):
-                    self._update_gauge(
-                        canvas=card["canvas"], value_label=card["value_label"], value=value, 
-                        unit=card["unit"], colors=card["colors"], secondary_color=self.COLOR_SECONDARY,
-                        text_secondary_color=self.COLOR_TEXT_SECONDARY, normal_font=self.FONT_NORMAL
-                    )
-                elif card.get("value_label"):
-                    display_text = "--" if value in [None, '--'] else str(value).upper()
-                    card['value_label'].configure(text=display_text)
-            except Exception as e:
-                self.log("UI_ERROR", f"Failed to update card for keys {card['keys']}: {e}")
+    def _render_card(self, card, value):
+        if not card['frame'].winfo_exists(): return
+        try:
+            if card.get("canvas"):
+                self._update_gauge(
+                    canvas=card["canvas"], value_label=card["value_label"], value=value, 
+                    unit=card["unit"], colors=card["colors"], secondary_color=self.COLOR_SECONDARY,
+                    text_secondary_color=self.COLOR_TEXT_SECONDARY, normal_font=self.FONT_NORMAL
+                )
+            elif card.get("value_label"):
+                display_text = "--" if value is None else value.upper()
+                card['value_label'].configure(text=display_text)
+        except Exception as e:
+            self.log("UI_ERROR", f"Failed to update card for {card['field']}: {e}")
+
+    def _format_eta(self, seconds):
+        if seconds is None or not math.isfinite(seconds): return "--"
+        minutes = int(seconds // 60)
+        if minutes < 1: return "< 1 mnt"
+        if minutes < 60: return f"{minutes} mnt"
+        if minutes < 48 * 60: return f"{minutes // 60} j {minutes % 60} mnt"
+        return f"{minutes // 1440} hari"
 
     def get_greeting(self):
         hour = datetime.now().hour
@@ -287,11 +363,11 @@ class DashboardApp(ctk.CTk):
 
     def send_device_command(self, command):
         self.log("COMMAND", f"Sending command: {command}")
+        if self.recorder and self.player is None:
+            self.recorder.write(KIND_COMMAND, {"device_id": self.device_id, "command": command})
         
         # Temporarily disable all buttons to prevent spam clicks
-        self.pump_on_btn.configure(state="disabled")
-        self.pump_off_btn.configure(state="disabled")
-        self.auto_mode_btn.configure(state="disabled")
+        self.ui_state.set("command_pending", True)
 
         def worker():
             try:
@@ -302,6 +378,9 @@ class DashboardApp(ctk.CTk):
 
                 if response.status_code == 200:
                     self.after(0, self.log, "COMMAND", f"Successfully sent '{command}' command.")
+                    # Poll fast for a while so the change shows up promptly
+                    self.poll_scheduler.on_command(time.time())
+                    self.after(0, self._expedite_poll)
                     # Refresh device info immediately to get the latest state
                     self.after(100, self.fetch_device_info) 
                 else:
@@ -311,19 +390,37 @@ class DashboardApp(ctk.CTk):
                 self.after(0, self.log, "COMMAND_ERROR", f"Connection error: {e}")
             finally:
                 # Re-enable all buttons after the operation is complete
-                self.after(500, self.update_control_buttons_state)
+                self.after(500, self.ui_state.set, "command_pending", False)
         
         threading.Thread(target=worker, daemon=True).start()
 
     def update_device_ui(self, device_info):
-        new_name = device_info.get('device_name', 'Unnamed Device')
+        if self.recorder and self.player is None and device_info != self._last_recorded_device:
+            self._last_recorded_device = dict(device_info)
+            self.recorder.write(KIND_DEVICE, self._last_recorded_device)
+        self.ui_state.update({
+            "device_name": device_info.get('device_name', 'Unnamed Device'),
+            "auto_mode": bool(device_info.get('auto_mode', False)),
+        })
+
+    def update_device_name(self, new_name):
         if hasattr(self, 'title_label') and self.title_label.winfo_exists():
             self.title_label.configure(text=new_name)
         self.title(f"{new_name} - Dashboard")
-        
-        is_auto = device_info.get('auto_mode', False)
-        self.update_auto_mode_status(is_auto)
-        self.update_control_buttons_state()
+
+    def update_connection_status(self, status):
+        if status == "online":
+            self.connection_label.configure(text="🟢 ONLINE", text_color=self.COLOR_PRIMARY)
+        elif status == "replay":
+            self.connection_label.configure(text="⏪ REPLAY", text_color="#29B6F6")
+        else:
+            self.connection_label.configure(text="🔴 OFFLINE", text_color="#F44336")
+
+    def update_health_panel(self, issues):
+        if not issues:
+            self.health_label.configure(text="🟢 Semua sensor normal", text_color=self.COLOR_PRIMARY)
+        else:
+            self.health_label.configure(text="\n".join(f"⚠️ {issue}" for issue in issues), text_color=self.COLOR_MANUAL_MODE)
 
     def update_auto_mode_status(self, is_auto):
         if is_auto:
@@ -332,14 +429,16 @@ class DashboardApp(ctk.CTk):
             self.auto_mode_label.configure(text="🟠 MANUAL MODE", text_color=self.COLOR_MANUAL_MODE)
     
     # === FUNCTION WITH THE FIX ===
-    def update_control_buttons_state(self):
+    def update_control_buttons_state(self, command_pending=False):
         """
         Enables control buttons. In this corrected version, all buttons are always
-        enabled to allow the user to switch modes at any time.
+        enabled to allow the user to switch modes at any time; they are only
+        disabled while a command is in flight.
         """
-        self.pump_on_btn.configure(state="normal")
-        self.pump_off_btn.configure(state="normal")
-        self.auto_mode_btn.configure(state="normal")
+        state = "disabled" if command_pending else "normal"
+        self.pump_on_btn.configure(state=state)
+        self.pump_off_btn.configure(state=state)
+        self.auto_mode_btn.configure(state=state)
             
     def show_device_info_and_edit_dialog(self, device_info):
         if not device_info: self.log("UI", "Cannot open settings: data missing."); return
@@ -396,6 +495,178 @@ class DashboardApp(ctk.CTk):
         except Exception as e:
             self.after(0, status_label.configure, {"text": f"Error: {e}", "text_color": "red"})
 
+    def show_group_command_window(self):
+        win = ctk.CTkToplevel(self, fg_color=self.COLOR_BACKGROUND); win.title("Group Command"); win.geometry("640x580"); win.transient(self)
+
+        header = ctk.CTkFrame(win, fg_color="transparent"); header.pack(fill="x", padx=20, pady=(20,10))
+        ctk.CTkLabel(header, text="Perintah Grup", font=self.FONT_TITLE).pack(side="left")
+        location_var = ctk.StringVar(value="Semua Lokasi")
+        location_menu = ctk.CTkOptionMenu(header, variable=location_var, values=["Semua Lokasi"], width=160)
+        location_menu.pack(side="right")
+
+        frame = ctk.CTkScrollableFrame(win, fg_color=self.COLOR_SECONDARY, corner_radius=10); frame.pack(fill="both", expand=True, padx=20, pady=10)
+        ctk.CTkLabel(frame, text="Memuat...").pack(pady=20)
+
+        summary_label = ctk.CTkLabel(win, text="", font=self.FONT_NORMAL, text_color=self.COLOR_TEXT_SECONDARY); summary_label.pack(pady=(0, 5))
+        btn_frame = ctk.CTkFrame(win, fg_color="transparent"); btn_frame.pack(pady=(0, 20), padx=20, fill="x")
+        btn_frame.grid_columnconfigure((0, 1), weight=1)
+
+        rows = {}  # device_id -> {"var", "status", "location"}
+        status_styles = {
+            STATE_PENDING: ("⏳ Mengirim", self.COLOR_TEXT_SECONDARY), STATE_SENT: ("📨 Terkirim", "#29B6F6"),
+            STATE_ACKED: ("✅ ACK", self.COLOR_PRIMARY), STATE_NO_ACK: ("⚠️ Tanpa ACK", self.COLOR_MANUAL_MODE),
+            STATE_FAILED: ("❌ Gagal", "#F44336"),
+        }
+        states = {}
+
+        def select_location(location):
+            for row in rows.values():
+                row["var"].set(location == "Semua Lokasi" or row["location"] == location)
+        location_menu.configure(command=select_location)
+
+        def populate(devices, error_msg=None):
+            if not win.winfo_exists(): return
+            for w in frame.winfo_children(): w.destroy()
+            if error_msg: ctk.CTkLabel(frame, text=error_msg, text_color="red").pack(); return
+            if not devices: ctk.CTkLabel(frame, text="Tidak ada perangkat ditemukan.").pack(); return
+            locations = sorted({d.get('location') or "-" for d in devices})
+            location_menu.configure(values=["Semua Lokasi"] + locations)
+            for device in devices:
+                row = ctk.CTkFrame(frame, fg_color=self.COLOR_CARD_BG, corner_radius=10)
+                row.pack(fill="x", pady=3, padx=5); row.grid_columnconfigure(0, weight=1)
+                var = ctk.BooleanVar(value=True)
+                text = f"{device.get('device_name', 'N/A')}  ·  {device.get('location') or '-'}"
+                ctk.CTkCheckBox(row, text=text, variable=var, font=self.FONT_NORMAL).grid(row=0, column=0, sticky="w", padx=10, pady=8)
+                status = ctk.CTkLabel(row, text="", font=("Roboto", 10, "bold"), width=110)
+                status.grid(row=0, column=1, padx=10)
+                rows[device.get('id')] = {"var": var, "status": status, "location": device.get('location') or "-"}
+
+        def update_summary():
+            counts = {}
+            for state in states.values(): counts[state] = counts.get(state, 0) + 1
+            summary_label.configure(text="   ".join(f"{status_styles[state][0]}: {counts[state]}" for state in status_styles if counts.get(state)))
+
+        def on_update(device_id, state, detail):
+            if not win.winfo_exists() or device_id not in rows: return
+            states[device_id] = state
+            text, color = status_styles[state]
+            rows[device_id]["status"].configure(text=text, text_color=color)
+            if detail: self.log("GROUP_CMD", f"Device {device_id}: {detail}")
+            update_summary()
+
+        def on_done(results, command, started, runner):
+            runner.close()
+            ok = sum(1 for state in results.values() if state != STATE_FAILED)
+            self.log("GROUP_CMD", f"{command}: {ok}/{len(results)} berhasil dalam {time.time() - started:.1f}s")
+            if not win.winfo_exists(): return
+            for button in buttons: button.configure(state="normal")
+
+        def send(command):
+            device_ids = [device_id for device_id, row in rows.items() if row["var"].get()]
+            if not device_ids: summary_label.configure(text="Pilih minimal satu perangkat."); return
+            for button in buttons: button.configure(state="disabled")
+            states.clear()
+            self.log("GROUP_CMD", f"Sending {command} to {len(device_ids)} devices...")
+            started = time.time()
+            runner = BulkCommandRunner(self.api_base_url, self.auth_token, self.request_timeout)
+            runner.run(device_ids, command,
+                       on_update=lambda *args: self.after(0, on_update, *args),
+                       on_done=lambda results: self.after(0, on_done, results, command, started, runner))
+            win.bind("<Destroy>", lambda e: runner.cancel() if e.widget is win else None, add="+")
+
+        buttons = [
+            ctk.CTkButton(btn_frame, text="Pump OFF (Grup)", command=lambda: send("PUMP_OFF"), fg_color="#F44336", hover_color="#E57373", height=40),
+            ctk.CTkButton(btn_frame, text="Set AUTO (Grup)", command=lambda: send("AUTO_ON"), fg_color="#2196F3", hover_color="#64B5F6", height=40),
+        ]
+        buttons[0].grid(row=0, column=0, padx=(0,5), sticky="ew"); buttons[1].grid(row=0, column=1, padx=(5,0), sticky="ew")
+
+        def worker():
+            try:
+                devices = fetch_devices(self.api_base_url, self.auth_token, self.request_timeout)
+                self.after(0, populate, devices)
+            except Exception as e:
+                self.after(0, populate, None, f"Error: {e}")
+        threading.Thread(target=worker, daemon=True).start()
+
+    def show_replay_dialog(self):
+        dialog = ctk.CTkToplevel(self, fg_color=self.COLOR_BACKGROUND); dialog.title("Replay Capture"); dialog.geometry("420x380"); dialog.transient(self)
+        ctk.CTkLabel(dialog, text="Replay Capture", font=("Roboto", 20, "bold"), text_color=self.COLOR_TEXT).pack(pady=(20,10))
+
+        form_frame = ctk.CTkFrame(dialog, fg_color=self.COLOR_CARD_BG, corner_radius=10)
+        form_frame.pack(fill="x", padx=20, pady=10)
+        ctk.CTkLabel(form_frame, text="File Capture", font=self.FONT_NORMAL, text_color=self.COLOR_TEXT_SECONDARY).pack(anchor="w", padx=20, pady=(15, 2))
+        path_entry = ctk.CTkEntry(form_frame, placeholder_text="captures/device.sgcap", height=35, fg_color=self.COLOR_SECONDARY, border_width=0)
+        path_entry.pack(fill="x", padx=20)
+        if self.capture_path: path_entry.insert(0, self.capture_path)
+        ctk.CTkLabel(form_frame, text="Mulai dari (YYYY-MM-DD HH:MM:SS, kosong = awal)", font=self.FONT_NORMAL, text_color=self.COLOR_TEXT_SECONDARY).pack(anchor="w", padx=20, pady=(15, 2))
+        time_entry = ctk.CTkEntry(form_frame, placeholder_text=datetime.now().strftime("%Y-%m-%d 03:12:00"), height=35, fg_color=self.COLOR_SECONDARY, border_width=0)
+        time_entry.pack(fill="x", padx=20)
+        ctk.CTkLabel(form_frame, text="Kecepatan", font=self.FONT_NORMAL, text_color=self.COLOR_TEXT_SECONDARY).pack(anchor="w", padx=20, pady=(15, 2))
+        speed_var = ctk.StringVar(value="1x")
+        ctk.CTkSegmentedButton(form_frame, values=["1x", "10x", "100x", "1000x"], variable=speed_var).pack(fill="x", padx=20, pady=(0, 15))
+
+        status_label = ctk.CTkLabel(dialog, text=""); status_label.pack(pady=5)
+
+        def play():
+            start_ts = None
+            text = time_entry.get().strip()
+            try:
+                if text: start_ts = datetime.strptime(text, "%Y-%m-%d %H:%M:%S").timestamp()
+                self.start_playback(path_entry.get().strip(), start_ts, float(speed_var.get().rstrip("x")))
+                status_label.configure(text="Memutar...", text_color="lightgreen")
+            except (ValueError, OSError) as e:
+                status_label.configure(text=f"Error: {e}", text_color="red")
+
+        btn_frame = ctk.CTkFrame(dialog, fg_color="transparent"); btn_frame.pack(pady=10, padx=20, fill="x")
+        btn_frame.grid_columnconfigure((0, 1), weight=1)
+        ctk.CTkButton(btn_frame, text="Stop", command=self.stop_playback, fg_color=self.COLOR_SECONDARY, hover_color="gray25").grid(row=0, column=0, padx=(0,5), sticky="ew")
+        ctk.CTkButton(btn_frame, text="Play", command=play, fg_color=self.COLOR_PRIMARY).grid(row=0, column=1, padx=(5,0), sticky="ew")
+
+    def start_playback(self, path, start_ts=None, speed=1.0):
+        """Replay a capture through the normal update_display/update_device_ui path."""
+        player = CapturePlayer(
+            path, self.after,
+            on_reading=lambda payload: self.update_display(decode_reading(payload)),
+            on_device=self.update_device_ui,
+            on_command=lambda payload: self.log("REPLAY", f"Command: {payload.get('command')}"),
+            on_finished=lambda: (self.log("REPLAY", "Replay selesai."), self.stop_playback()),
+        )
+        if self.player is not None:
+            # Switching captures: keep the live state saved by the first replay
+            self.player.close(); self.player = None
+        else:
+            self._live_context = {
+                "health_monitor": self.health_monitor, "forecaster": self.forecaster,
+                "connection": self.ui_state.get("connection"), "auto_refresh": self.auto_var.get(),
+            }
+        # Replayed history gets its own analytics so it never leaks into the live per-device state
+        self.health_monitor = HealthMonitor()
+        self.forecaster = Forecaster()
+        # Live polling would fight the replayed state
+        if self.auto_var.get():
+            self.auto_var.set(False); self.toggle_auto()
+        self.player = player
+        self.ui_state.set("connection", "replay")
+        self.log("REPLAY", f"Memutar {path} ({speed:g}x)")
+        player.play(start_ts, speed)
+
+    def stop_playback(self, resume=True):
+        if self.player is None: return
+        self.player.close(); self.player = None
+        self.log("REPLAY", "Replay dihentikan.")
+        context, self._live_context = self._live_context, None
+        self.health_monitor = context["health_monitor"]
+        self.forecaster = context["forecaster"]
+        if not resume: return  # closing down: nothing to restore on screen
+        self.ui_state.set("connection", context["connection"])
+        if self.device_info: self.update_device_ui(self.device_info)
+        if context["auto_refresh"]:
+            self.auto_var.set(True); self.toggle_auto()
+
+    def _close_capture(self):
+        self.stop_playback(resume=False)
+        if self.recorder: self.recorder.close(); self.recorder = None
+
     def show_users_window(self):
         if not self.is_admin: return
         win = ctk.CTkToplevel(self, fg_color=self.COLOR_BACKGROUND); win.title("Kelola Pengguna"); win.geometry("600x500"); win.transient(self); win.grab_set()
@@ -475,16 +746,109 @@ class DashboardApp(ctk.CTk):
         self.auto_refresh_enabled = self.auto_var.get()
         self.log("Auto", "Auto refresh " + ("dimulai." if self.auto_refresh_enabled else "dihentikan."))
         if self.auto_refresh_enabled: self.start_auto_refresh()
+        elif self.acquisition: self.acquisition.send(CTRL_PAUSE)
 
     def start_auto_refresh(self):
         if not self.auto_refresh_enabled: return
-        self.fetch_data()
-        self.fetch_device_info()
-        self.after(self.refresh_interval * 1000, self.start_auto_refresh)
+        if self.acquisition_mode == "process":
+            self._start_acquisition(); return
+        if self._poll_job is not None:
+            self.after_cancel(self._poll_job)
+            self._poll_job = None
+        # The worker reschedules when it finishes, so polls never overlap
+        if self._poll_in_flight: return
+        self._poll_in_flight = True
+        threading.Thread(target=self._poll_worker, daemon=True).start()
+
+    def _poll_worker(self):
+        try:
+            self.fetch_data()
+            now = time.time()
+            if now - self._last_device_info_poll >= self.device_info_interval or now < self.poll_scheduler.boost_until:
+                self._last_device_info_poll = now
+                self.fetch_device_info()
+        finally:
+            self.after(0, self._schedule_next_poll)
+
+    def _schedule_next_poll(self):
+        self._poll_in_flight = False
+        if not self.auto_refresh_enabled: return
+        delay = self.poll_scheduler.next_delay(time.time())
+        self._poll_job = self.after(int(delay * 1000), self.start_auto_refresh)
+
+    def _start_acquisition(self):
+        if self.acquisition is None:
+            self.acquisition = AcquisitionProcess(self.sensor_api_endpoint, self.auth_token, self.request_timeout, self.refresh_interval)
+            self.acquisition.send(CTRL_VISIBILITY, self.poll_scheduler.visibility)
+            self.log("Data", f"Acquisition process started (pid {self.acquisition.process.pid}).")
+        else:
+            self.acquisition.send(CTRL_RESUME)
+        if self._drain_job is None:
+            self._drain_job = self.after(self.FRAME_MS, self._drain_acquisition)
+
+    def _drain_acquisition(self):
+        """Per-frame check of the acquisition pipe; only the newest record is rendered."""
+        self._drain_job = None
+        if self.acquisition is None: return
+        readings, notices = self.acquisition.drain()
+        if readings:
+            try:
+                self.update_display(readings[-1])
+            except Exception as e:
+                # Keep draining: one bad reading must not stop acquisition
+                self.log("UI_ERROR", f"Failed to display reading: {e}")
+            self.ui_state.set("connection", "online")
+        elif MSG_OFFLINE in notices:
+            self.ui_state.set("connection", "offline")
+        if MSG_AUTH_EXPIRED in notices:
+            self.handle_token_expired(); return
+        # Device info is light and infrequent; keep it on the UI side's worker threads
+        now = time.time()
+        if self.auto_refresh_enabled and now - self._last_device_info_poll >= self.device_info_interval:
+            self._last_device_info_poll = now
+            self.fetch_device_info()
+        self._drain_job = self.after(self.FRAME_MS, self._drain_acquisition)
+
+    def _stop_acquisition(self):
+        if self._drain_job is not None:
+            self.after_cancel(self._drain_job)
+            self._drain_job = None
+        if self.acquisition is not None:
+            self.acquisition.stop()
+            self.acquisition = None
+
+    def _expedite_poll(self):
+        if self.acquisition:
+            self.acquisition.send(CTRL_BOOST); return
+        if self._poll_in_flight or not self.auto_refresh_enabled: return
+        if self._poll_job is not None:
+            self.after_cancel(self._poll_job)
+        self._poll_job = self.after(int(self.poll_scheduler.min_interval * 1000), self.start_auto_refresh)
+
+    def _on_visibility_event(self, event):
+        # Child widgets share the toplevel bindtag; re-evaluate once events settle
+        self.after_idle(self._update_visibility)
+
+    def _update_visibility(self):
+        try:
+            if self.wm_state() == "iconic" or not self.winfo_viewable():
+                visibility = "hidden"
+            elif self.focus_get() is None:
+                visibility = "unfocused"
+            else:
+                visibility = "visible"
+        except Exception:
+            return
+        if visibility == self.poll_scheduler.visibility: return
+        previous = self.poll_scheduler.visibility
+        self.poll_scheduler.set_visibility(visibility)
+        if self.acquisition: self.acquisition.send(CTRL_VISIBILITY, visibility)
+        # Coming back into view: don't wait out a long hidden-mode delay
+        if previous == "hidden": self._expedite_poll()
         
     def manual_refresh(self): 
         self.log("Data", "Meminta refresh manual..."); 
-        self.fetch_data()
+        threading.Thread(target=self.fetch_data, daemon=True).start()
         self.fetch_device_info()
         
     def fetch_data(self):
@@ -493,19 +857,28 @@ class DashboardApp(ctk.CTk):
             response = requests.get(self.sensor_api_endpoint, headers=headers, timeout=self.request_timeout)
             if response.status_code == 200:
                 data = response.json()
-                self.log("API_DEBUG", f"Sensor data received: {str(data)[:200]}")
-                self.after(0, self.update_display, data.get('data', data))
+                reading = decode_reading(data.get('data', data))
+                self.poll_scheduler.on_reading(reading.server_timestamp, time.time())
+                self.after(0, self.update_display, reading)
+                self.after(0, self.ui_state.set, "connection", "online")
             elif response.status_code == 401: self.after(0, self.handle_token_expired)
-        except Exception as e: self.log("API", f"Fetch Error: {e}")
+            else:
+                # 404 just means no reading yet; back off on server errors
+                if response.status_code >= 500: self.poll_scheduler.on_failure()
+                self.after(0, self.ui_state.set, "connection", "offline")
+        except Exception as e:
+            self.poll_scheduler.on_failure()
+            self.log("API", f"Fetch Error: {e}")
+            self.after(0, self.ui_state.set, "connection", "offline")
             
     def handle_token_expired(self): self.log("Auth", "Token kedaluwarsa."); self.logout()
     
     def logout(self): 
-        self.auto_refresh_enabled=False; self.destroy()
+        self.auto_refresh_enabled=False; self._stop_acquisition(); self._close_capture(); self.destroy()
         try: from main import main; main()
         except ImportError: print("Could not re-open main login window.")
     
-    def on_closing(self): self.auto_refresh_enabled=False; self.destroy()
+    def on_closing(self): self.auto_refresh_enabled=False; self._stop_acquisition(); self._close_capture(); self.destroy()
 
 if __name__ == '__main__':
     current_user_role = 'admin'
@@ -0,0 +1,198 @@
+import math
+
+PUMP_ON_STATUSES = ("MED", "HIGH", "MAX")
+
+
+class RecursiveLeastSquares:
+    """
+    Online fit of y = intercept + slope * x with exponential forgetting.
+    Each update is O(1) (2x2 covariance), nothing is refitted over history.
+
+    Forgetting inflates P in directions the data doesn't excite (covariance
+    windup), so callers pass forgetting=1.0 for samples that repeat an x already
+    seen, and the trace of P is capped at its initial value.
+    """
+    __slots__ = ("forgetting", "intercept", "slope", "p00", "p01", "p11", "max_trace", "count")
+
+    def __init__(self, forgetting=0.98, intercept=0.0, slope=0.0, slope_variance=1e3):
+        self.forgetting = forgetting
+        self.intercept = intercept
+        self.slope = slope
+        # Large initial variance = "no idea"; a smaller slope_variance keeps a prior slope
+        self.p00, self.p01, self.p11 = 1e6, 0.0, slope_variance
+        self.max_trace = self.p00 + self.p11
+        self.count = 0
+
+    def update(self, x, y, forgetting=None):
+        p00, p01, p11 = self.p00, self.p01, self.p11
+        lam = self.forgetting if forgetting is None else forgetting
+        # a = P @ phi with phi = (1, x); gain K = a / (lambda + phi^T a)
+        a0 = p00 + p01 * x
+        a1 = p01 + p11 * x
+        denom = lam + a0 + a1 * x
+        k0 = a0 / denom
+        k1 = a1 / denom
+        error = y - (self.intercept + self.slope * x)
+        self.intercept += k0 * error
+        self.slope += k1 * error
+        # P = (P - K a^T) / lambda
+        inv = 1.0 / lam
+        p00 = (p00 - k0 * a0) * inv
+        p01 = (p01 - k0 * a1) * inv
+        p11 = (p11 - k1 * a1) * inv
+        trace = p00 + p11
+        if trace > self.max_trace:
+            scale = self.max_trace / trace
+            p00 *= scale; p01 *= scale; p11 *= scale
+        self.p00, self.p01, self.p11 = p00, p01, p11
+        self.count += 1
+
+    def is_finite(self):
+        return math.isfinite(self.intercept) and math.isfinite(self.slope)
+
+    def predict(self, x):
+        return self.intercept + self.slope * x
+
+
+class DeviceForecast:
+    """
+    Per-device tank-depletion and next-watering forecast, updated per reading.
+
+    Water only leaves the tank while the pump runs, so the tank model regresses
+    water_percentage on cumulative pump-on seconds (drain per pump-second) and
+    scales it by a time-weighted EWMA of the pump duty cycle. The tank fit
+    forgets per pump-second (water_memory_s), not per reading, so the polling
+    rate doesn't change how much history it keeps. Soil moisture is
+    fitted per drying phase (pump off); each new phase starts from the previous
+    phase's drying rate.
+    """
+    def __init__(self, watering_threshold=40.0, refill_jump=10.0, duty_tau_s=6 * 3600.0, forgetting=0.98,
+                 water_memory_s=1800.0):
+        self.watering_threshold = watering_threshold
+        self.refill_jump = refill_jump
+        self.duty_tau_s = duty_tau_s
+        self.forgetting = forgetting
+        self.water_memory_s = water_memory_s
+
+        self.water_model = RecursiveLeastSquares(forgetting)
+        self.pump_seconds = 0.0
+        self.fitted_pump_seconds = None  # pump_seconds of the last water_model update
+        self.duty = None
+        self._duty_sum = 0.0
+        self._duty_weight = 0.0
+        self.soil_model = None
+        self.segment_start = None
+        self.drying_rate = None       # last known soil slope (%/s, negative when drying)
+
+        self.last_key = None
+        self.last_ts = None
+        self.last_pumping = False
+        self.last_water = None
+        self.water = None
+        self.soil = None
+        self.pumping = False
+
+    def update(self, reading):
+        key = reading.id if reading.id is not None else reading.server_timestamp
+        ts = reading.server_timestamp
+        if ts is None or (key is not None and key == self.last_key):
+            return
+        self.last_key = key
+        pumping = reading.pump_status in PUMP_ON_STATUSES or (reading.pump_pwm_value or 0) > 0
+
+        if self.last_ts is not None and ts > self.last_ts:
+            dt = ts - self.last_ts
+            # Time-weighted duty cycle: the previous state held for dt seconds
+            # (bias-corrected, so the first hours aren't pulled towards 0)
+            alpha = 1.0 - math.exp(-dt / self.duty_tau_s)
+            on = 1.0 if self.last_pumping else 0.0
+            self._duty_sum += alpha * (on - self._duty_sum)
+            self._duty_weight += alpha * (1.0 - self._duty_weight)
+            self.duty = self._duty_sum / self._duty_weight
+            if self.last_pumping:
+                self.pump_seconds += dt
+
+        water = reading.water_percentage
+        if water is not None:
+            if not self.water_model.is_finite():
+                self.water_model = RecursiveLeastSquares(self.forgetting, intercept=water)
+                self.pump_seconds, self.fitted_pump_seconds = 0.0, None
+            elif self._refilled(water):
+                # Tank refilled: old drain fit no longer applies to the level
+                self.water_model = RecursiveLeastSquares(self.forgetting, intercept=water,
+                                                         slope=self.water_model.slope, slope_variance=1.0)
+                self.pump_seconds, self.fitted_pump_seconds = 0.0, None
+            # Idle readings (pump_seconds unchanged) only refine the current level;
+            # forgetting on them would wind up P in the slope direction
+            pumped = 0.0 if self.fitted_pump_seconds is None else self.pump_seconds - self.fitted_pump_seconds
+            self.water_model.update(self.pump_seconds, water, math.exp(-pumped / self.water_memory_s))
+            self.fitted_pump_seconds = self.pump_seconds
+            self.last_water = water
+            self.water = water
+
+        soil = reading.soil_moisture_percent
+        if pumping:
+            if self.soil_model is not None and self.soil_model.count >= 3 and self.soil_model.is_finite():
+                self.drying_rate = self.soil_model.slope
+            self.soil_model = None
+        elif soil is not None:
+            if self.soil_model is None:
+                # New drying phase: restart the fit but keep the last drying rate as prior
+                self.segment_start = ts
+                self.soil_model = RecursiveLeastSquares(self.forgetting, intercept=soil,
+                                                        slope=self.drying_rate or 0.0,
+                                                        slope_variance=1e3 if self.drying_rate is None else 1e-4)
+            self.soil_model.update(ts - self.segment_start, soil)
+            self.soil = soil
+
+        self.pumping = pumping
+        self.last_pumping = pumping
+        self.last_ts = ts
+
+    def _refilled(self, water):
+        # Compare with the fitted level once there is one, so sensor noise
+        # between two raw readings doesn't look like a refill
+        if self.water_model.count >= 3:
+            reference = self.water_model.predict(self.pump_seconds)
+        else:
+            reference = self.last_water
+        return reference is not None and water - reference > self.refill_jump
+
+    def time_to_empty(self):
+        """Seconds until water_percentage reaches 0, or None if not draining."""
+        drain = -self.water_model.slope
+        if self.water is None or self.water_model.count < 3 or not drain > 0 or not self.duty:
+            return None
+        # Fitted level is less noisy than the latest raw reading
+        level = max(self.water_model.predict(self.pump_seconds), 0.0)
+        eta = level / (drain * self.duty)
+        return eta if math.isfinite(eta) else None
+
+    def time_to_next_watering(self):
+        """Seconds until soil moisture drops to the watering threshold (0 while watering/due)."""
+        if self.pumping:
+            return 0.0
+        if self.soil is None:
+            return None
+        if self.soil <= self.watering_threshold:
+            return 0.0
+        model = self.soil_model
+        slope = model.slope if model is not None and model.count >= 3 else self.drying_rate
+        if slope is None or not slope < 0:
+            return None
+        eta = (self.soil - self.watering_threshold) / -slope
+        return eta if math.isfinite(eta) else None
+
+
+class Forecaster:
+    """Fleet entry point: one DeviceForecast per device_id."""
+    def __init__(self, **device_options):
+        self.device_options = device_options
+        self.devices = {}
+
+    def update(self, reading):
+        device = self.devices.get(reading.device_id)
+        if device is None:
+            device = self.devices[reading.device_id] = DeviceForecast(**self.device_options)
+        device.update(reading)
+        return device
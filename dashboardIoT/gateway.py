@@ -0,0 +1,367 @@
+"""
+Smart Garden fan-out gateway.
+
+Sits between many dashboards and the Go API. Each device is polled upstream
+exactly once per interval (with the gateway's own service login), and every
+dashboard asking for the same device gets the cached snapshot, so upstream
+load is O(devices) instead of O(dashboards x devices).
+
+Point the dashboard's API_BASE_URL at the gateway, e.g.
+    API_BASE_URL = "http://<gateway-host>:8090/api"
+
+Served from cache (client token still checked):
+    GET /api/sensor-readings/device/{id}/latest   (and /api/sensor-data/...)
+    GET /api/devices/{id}
+Change notifications (Server-Sent Events, one event per changed snapshot):
+    GET /gateway/devices/{id}/events
+Everything else (login, commands, user management, ...) is proxied upstream
+unchanged with the client's own Authorization header.
+
+Configuration (environment):
+    UPSTREAM_API_URL   Go API base, default http://127.0.0.1:8080/api
+    GATEWAY_EMAIL      service account used for upstream polling
+    GATEWAY_PASSWORD
+    GATEWAY_PORT       default 8090
+    POLL_INTERVAL      seconds between sensor polls per device, default 1
+    DEVICE_INTERVAL    seconds between device-info polls, default 5
+    LOGIN_BACKOFF      seconds to wait after a failed upstream login, default 30
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import re
+import time
+import urllib.error
+import urllib.request
+
+LATEST_RE = re.compile(r"^/api/sensor-(?:readings|data)/device/(\d+)/latest/?$")
+DEVICE_RE = re.compile(r"^/api/devices/(\d+)/?$")
+COMMAND_RE = re.compile(r"^/api/devices/(\d+)/command")
+EVENTS_RE = re.compile(r"^/gateway/devices/(\d+)/events/?$")
+
+REASONS = {200: "OK", 204: "No Content", 304: "Not Modified", 400: "Bad Request", 401: "Unauthorized",
+           404: "Not Found", 413: "Payload Too Large", 502: "Bad Gateway", 503: "Service Unavailable"}
+# Largest request body accepted from clients (commands, logins and device edits are tiny)
+MAX_BODY_BYTES = 64 * 1024
+
+
+class BadRequest(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Snapshot:
+    __slots__ = ("status", "content_type", "body", "etag", "version", "fetched_at")
+
+    def __init__(self, status, content_type, body, version):
+        self.status = status
+        self.content_type = content_type or "application/json; charset=utf-8"
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+        self.version = version
+        self.fetched_at = time.time()
+
+
+def _http_request(url, method="GET", headers=None, body=None, timeout=5):
+    """Blocking upstream call (run via asyncio.to_thread). Returns (status, content_type, body)."""
+    request = urllib.request.Request(url, data=body, method=method, headers=headers or {})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, response.headers.get("Content-Type"), response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers.get("Content-Type"), e.read()
+    except (urllib.error.URLError, OSError) as e:
+        return 502, "application/json", json.dumps({"error": f"Upstream unreachable: {e}"}).encode()
+
+
+class Upstream:
+    """The Go API, accessed with the gateway's own (single) login."""
+    def __init__(self, base_url, email, password, timeout=5, login_backoff=30.0):
+        self.base_url = base_url.rstrip("/")
+        self.email = email
+        self.password = password
+        self.timeout = timeout
+        self.token = None
+        # After a failed login, don't try again (for any device) for this long
+        self.login_backoff = login_backoff
+        self._next_login_at = 0.0
+        self._login_lock = asyncio.Lock()
+
+    async def request(self, method, path, headers=None, body=None):
+        return await asyncio.to_thread(_http_request, self.base_url + path, method, headers, body, self.timeout)
+
+    async def login(self):
+        async with self._login_lock:
+            if time.time() < self._next_login_at:
+                return False
+            ok = await self._login()
+            self._next_login_at = 0.0 if ok else time.time() + self.login_backoff
+            return ok
+
+    async def _login(self):
+        payload = json.dumps({"email": self.email, "password": self.password}).encode()
+        status, _, body = await self.request("POST", "/auth/login", {"Content-Type": "application/json"}, payload)
+        if status != 200:
+            print(f"GATEWAY: upstream login failed ({status}), retrying in {self.login_backoff:g}s")
+            self.token = None
+            return False
+        try:
+            self.token = json.loads(body).get("token")
+        except (ValueError, AttributeError):
+            self.token = None
+        if not self.token:
+            print(f"GATEWAY: upstream login returned no token, retrying in {self.login_backoff:g}s")
+            return False
+        print("GATEWAY: upstream login OK")
+        return True
+
+    async def get_authenticated(self, path):
+        if not self.token and not await self.login():
+            return 503, "application/json", json.dumps({"error": "Gateway not authenticated upstream"}).encode()
+        result = await self.request("GET", path, {"Authorization": f"Bearer {self.token}"})
+        if result[0] == 401 and await self.login():
+            result = await self.request("GET", path, {"Authorization": f"Bearer {self.token}"})
+        return result
+
+
+class TokenCache:
+    """
+    Per-client token check. A token is validated once against upstream
+    /profile and then trusted until its JWT exp (capped by max_ttl).
+    """
+    def __init__(self, upstream, max_ttl=300.0, negative_ttl=10.0):
+        self.upstream = upstream
+        self.max_ttl = max_ttl
+        self.negative_ttl = negative_ttl
+        self._cache = {}  # token -> (valid, expires_at)
+
+    async def check(self, auth_header):
+        if not auth_header or not auth_header.startswith("Bearer "):
+            return False
+        token = auth_header[7:]
+        now = time.time()
+        cached = self._cache.get(token)
+        if cached and cached[1] > now:
+            return cached[0]
+        status, _, _ = await self.upstream.request("GET", "/profile", {"Authorization": auth_header})
+        valid = status == 200
+        expires = now + (min(self.max_ttl, max(0.0, _jwt_exp(token) - now)) if valid else self.negative_ttl)
+        if len(self._cache) > 10000:
+            self._cache = {k: v for k, v in self._cache.items() if v[1] > now}
+        self._cache[token] = (valid, expires)
+        return valid
+
+
+def _jwt_exp(token):
+    """Read exp from the JWT payload without verifying (upstream already did)."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload)).get("exp", 0)) or float("inf")
+    except (IndexError, ValueError, AttributeError):
+        return float("inf")  # opaque token: rely on max_ttl
+
+
+class DevicePoller:
+    """Polls one device's latest reading and device info; stops when nobody asks for it."""
+    def __init__(self, gateway, device_id):
+        self.gateway = gateway
+        self.device_id = device_id
+        self.paths = {"latest": f"/sensor-readings/device/{device_id}/latest", "device": f"/devices/{device_id}"}
+        self.snapshots = {"latest": None, "device": None}
+        self.ready = {kind: asyncio.Event() for kind in self.paths}
+        self.version = 0
+        self.changed = asyncio.Condition()
+        self.last_access = time.time()
+        self.listeners = 0
+        self._next_device_poll = 0.0
+        self.task = asyncio.create_task(self.run())
+
+    async def run(self):
+        gw = self.gateway
+        try:
+            while self.listeners or time.time() - self.last_access < gw.idle_timeout:
+                await self.refresh("latest")
+                if time.time() >= self._next_device_poll:
+                    await self.refresh("device")
+                await asyncio.sleep(gw.poll_interval)
+        finally:
+            gw.pollers.pop(self.device_id, None)
+            print(f"GATEWAY: stopped polling device {self.device_id} (idle)")
+
+    async def refresh(self, kind):
+        if kind == "device":
+            self._next_device_poll = time.time() + self.gateway.device_interval
+        try:
+            status, content_type, body = await self.gateway.upstream.get_authenticated(self.paths[kind])
+        except Exception as e:
+            # Never let the poll task die: waiting dashboards would hang on ready
+            print(f"GATEWAY: polling device {self.device_id} ({kind}) failed: {e!r}")
+            status, content_type, body = 502, "application/json", json.dumps({"error": f"Gateway error: {e}"}).encode()
+        try:
+            previous = self.snapshots[kind]
+            if previous is not None and previous.status == status and previous.body == body:
+                previous.fetched_at = time.time()
+            else:
+                self.version += 1
+                self.snapshots[kind] = Snapshot(status, content_type, body, self.version)
+                async with self.changed:
+                    self.changed.notify_all()
+        finally:
+            self.ready[kind].set()
+
+    async def snapshot(self, kind):
+        self.last_access = time.time()
+        await self.ready[kind].wait()
+        return self.snapshots[kind]
+
+
+class Gateway:
+    def __init__(self, upstream, poll_interval=1.0, device_interval=5.0, idle_timeout=30.0):
+        self.upstream = upstream
+        self.tokens = TokenCache(upstream)
+        self.poll_interval = poll_interval
+        self.device_interval = device_interval
+        self.idle_timeout = idle_timeout
+        self.pollers = {}
+
+    def poller(self, device_id):
+        poller = self.pollers.get(device_id)
+        if poller is None:
+            poller = self.pollers[device_id] = DevicePoller(self, device_id)
+            print(f"GATEWAY: started polling device {device_id}")
+        return poller
+
+    async def handle(self, reader, writer):
+        try:
+            request = await _read_request(reader)
+            if request is None:
+                return
+            method, path, headers, body = request
+            route = path.split("?", 1)[0]
+
+            if method == "GET" and (LATEST_RE.match(route) or DEVICE_RE.match(route) or EVENTS_RE.match(route)):
+                if not await self.tokens.check(headers.get("authorization")):
+                    await _respond(writer, 401, json.dumps({"error": "Token tidak valid"}).encode())
+                    return
+                match = EVENTS_RE.match(route)
+                if match:
+                    await self.stream_events(writer, self.poller(int(match.group(1))))
+                    return
+                match = LATEST_RE.match(route)
+                kind = "latest" if match else "device"
+                match = match or DEVICE_RE.match(route)
+                snapshot = await self.poller(int(match.group(1))).snapshot(kind)
+                if headers.get("if-none-match") == snapshot.etag:
+                    await _respond(writer, 304, b"", extra={"ETag": snapshot.etag})
+                else:
+                    await _respond(writer, snapshot.status, snapshot.body, snapshot.content_type, {"ETag": snapshot.etag})
+                return
+
+            await self.proxy(writer, method, path, headers, body)
+        except BadRequest as e:
+            await _respond(writer, e.status, json.dumps({"error": str(e)}).encode())
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def proxy(self, writer, method, path, headers, body):
+        upstream_path = path[len("/api"):] if path.startswith("/api/") else path
+        forward = {k: v for k, v in headers.items() if k in ("authorization", "content-type", "accept")}
+        status, content_type, response_body = await self.upstream.request(method, upstream_path, forward, body or None)
+        await _respond(writer, status, response_body, content_type)
+        match = COMMAND_RE.match(path)
+        if match and status < 300 and int(match.group(1)) in self.pollers:
+            # Let every dashboard see the new mode/command right away
+            asyncio.create_task(self.pollers[int(match.group(1))].refresh("device"))
+
+    async def stream_events(self, writer, poller):
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\nConnection: keep-alive\r\n\r\n")
+        poller.listeners += 1
+        seen = {}
+        try:
+            while True:
+                for kind in ("latest", "device"):
+                    snapshot = poller.snapshots[kind]
+                    if snapshot is not None and seen.get(kind) != snapshot.version:
+                        seen[kind] = snapshot.version
+                        data = snapshot.body.replace(b"\n", b"")
+                        writer.write(b"event: " + kind.encode() + b"\nid: " + str(snapshot.version).encode()
+                                     + b"\ndata: " + data + b"\n\n")
+                await writer.drain()
+                poller.last_access = time.time()
+                has_news = lambda: any(snapshot is not None and seen.get(kind) != snapshot.version
+                                       for kind, snapshot in poller.snapshots.items())
+                async with poller.changed:
+                    try:
+                        await asyncio.wait_for(poller.changed.wait_for(has_news), timeout=15)
+                    except asyncio.TimeoutError:
+                        writer.write(b": keep-alive\n\n")
+        finally:
+            poller.listeners -= 1
+
+
+async def _read_request(reader):
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, path, _ = request_line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        return None
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0) or 0)
+    except ValueError:
+        raise BadRequest(400, "Content-Length tidak valid")
+    if length < 0:
+        raise BadRequest(400, "Content-Length tidak valid")
+    if length > MAX_BODY_BYTES:
+        raise BadRequest(413, f"Request body lebih dari {MAX_BODY_BYTES} byte")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), path, headers, body
+
+
+async def _respond(writer, status, body, content_type="application/json; charset=utf-8", extra=None):
+    head = [f"HTTP/1.1 {status} {REASONS.get(status, 'OK')}", f"Content-Length: {len(body)}", "Connection: close"]
+    if body:
+        head.append(f"Content-Type: {content_type}")
+    for name, value in (extra or {}).items():
+        head.append(f"{name}: {value}")
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+
+
+async def serve():
+    upstream = Upstream(os.getenv("UPSTREAM_API_URL", "http://127.0.0.1:8080/api"),
+                        os.getenv("GATEWAY_EMAIL", ""), os.getenv("GATEWAY_PASSWORD", ""),
+                        login_backoff=float(os.getenv("LOGIN_BACKOFF", "30")))
+    gateway = Gateway(upstream,
+                      poll_interval=float(os.getenv("POLL_INTERVAL", "1")),
+                      device_interval=float(os.getenv("DEVICE_INTERVAL", "5")))
+    await upstream.login()
+    port = int(os.getenv("GATEWAY_PORT", "8090"))
+    server = await asyncio.start_server(gateway.handle, "0.0.0.0", port)
+    print(f"🚀 Gateway listening on port {port}, upstream {upstream.base_url}")
+    async with server:
+        await server.serve_forever()
+
+def main():
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
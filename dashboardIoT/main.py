@@ -4,7 +4,7 @@ from dashboard import DashboardApp
 
 # KONFIGURASI API
 API_SERVER_IP = "192.168.39.89"
-API_SERVER_PORT = "8080"
+API_SERVER_PORT = "8080"  # atau port gateway.py (8090) jika banyak dashboard memantau device yang sama
 DEVICE_ID = "4"
 API_BASE_URL = f"http://{API_SERVER_IP}:{API_SERVER_PORT}/api"
 API_ENDPOINT = f"{API_BASE_URL}/sensor-readings/device/{DEVICE_ID}/latest"
@@ -12,6 +12,10 @@ API_ENDPOINT = f"{API_BASE_URL}/sensor-readings/device/{DEVICE_ID}/latest"
 # KONFIGURASI
 REFRESH_INTERVAL = 1  # 1 detik
 REQUEST_TIMEOUT = 2
+# "thread" atau "process" (polling & decoding di proses terpisah, data lewat shared memory)
+ACQUISITION_MODE = "thread"
+# Rekam semua snapshot ke file capture untuk replay, mis. "captures/device4.sgcap" (None = nonaktif)
+CAPTURE_PATH = None
 
 # Set appearance
 ctk.set_appearance_mode("dark")
@@ -83,7 +87,9 @@ class SmartGardenMain(ctk.CTk):
         
         # Create and show dashboard
         dashboard = DashboardApp(auth_token, user_data, API_ENDPOINT, 
-                                REQUEST_TIMEOUT, REFRESH_INTERVAL)
+                                REQUEST_TIMEOUT, REFRESH_INTERVAL,
+                                acquisition_mode=ACQUISITION_MODE,
+                                capture_path=CAPTURE_PATH)
         dashboard.protocol("WM_DELETE_WINDOW", dashboard.on_closing)
         
         # Auto start monitoring
@@ -0,0 +1,108 @@
+import random
+
+
+class AdaptivePollScheduler:
+    """
+    Decides how long to wait before the next sensor poll.
+
+    - Learns the device's posting cadence from server_timestamp deltas (EWMA)
+      and aims the next poll just after the expected next reading.
+    - Backs off exponentially on connection errors / 5xx responses.
+    - Slows down while the window is unfocused or minimized.
+    - Polls quickly for a short while after a device command was sent.
+
+    Pure logic, no Tk or network: the dashboard feeds it events and asks for
+    next_delay(). All times are in seconds.
+    """
+    def __init__(self, base_interval=1.0, min_interval=0.5, max_interval=60.0,
+                 unfocused_factor=3.0, hidden_interval=30.0, boost_duration=10.0,
+                 arrival_margin=0.3, smoothing=0.25, drift_step=0.05):
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.unfocused_factor = unfocused_factor
+        self.hidden_interval = hidden_interval
+        self.boost_duration = boost_duration
+        self.arrival_margin = arrival_margin
+        self.smoothing = smoothing
+        self.drift_step = drift_step
+
+        self.cadence = None           # learned seconds between device posts
+        self.clock_offset = None      # local_time - server_time (minimum observed)
+        self.last_server_ts = None
+        self.consecutive_failures = 0
+        self.visibility = "visible"   # visible | unfocused | hidden
+        self.boost_until = 0.0
+
+    # --- Events ---
+    def on_reading(self, server_ts, now):
+        """Record a successful poll; server_ts is the reading's server_timestamp (epoch s)."""
+        self.consecutive_failures = 0
+        if server_ts is None:
+            return
+        if self.last_server_ts is not None and server_ts <= self.last_server_ts:
+            # Same reading again. If it was already due, the offset estimate is too
+            # low (clocks drifted apart): nudge it up. Only while the reading is
+            # merely late, not once the device looks offline.
+            if self.cadence is not None and self.clock_offset is not None:
+                late = now - (self.last_server_ts + self.clock_offset + self.cadence + self.arrival_margin)
+                if 0 <= late < self.cadence:
+                    self.clock_offset += self.drift_step
+            return
+
+        # Observed offset = true clock offset + detection delay (>= 0), so the
+        # smallest observation is the best estimate; it never creeps up on hits.
+        observed = now - server_ts
+        if self.clock_offset is None or observed < self.clock_offset:
+            self.clock_offset = observed
+
+        if self.last_server_ts is not None:
+            delta = server_ts - self.last_server_ts
+            if self.cadence is None:
+                self.cadence = delta
+            elif delta < self.cadence * 4:
+                # ignore long gaps (device offline) so they don't skew the cadence
+                self.cadence += self.smoothing * (delta - self.cadence)
+        self.last_server_ts = server_ts
+
+    def on_failure(self):
+        """Connection error, timeout or 5xx."""
+        self.consecutive_failures += 1
+
+    def on_command(self, now):
+        self.boost_until = now + self.boost_duration
+
+    def set_visibility(self, visibility):
+        self.visibility = visibility
+
+    # --- Decision ---
+    def next_delay(self, now):
+        if self.consecutive_failures:
+            backoff = self.base_interval * (2 ** min(self.consecutive_failures, 16))
+            delay = min(backoff, self.max_interval)
+            return delay * random.uniform(0.8, 1.0)
+
+        if now < self.boost_until:
+            return self.min_interval
+
+        delay = self._cadence_delay(now)
+        if self.visibility == "unfocused":
+            delay *= self.unfocused_factor
+        elif self.visibility == "hidden":
+            delay = max(delay, self.hidden_interval)
+        return min(max(delay, self.min_interval), self.max_interval)
+
+    def _cadence_delay(self, now):
+        if self.cadence is None or self.clock_offset is None:
+            return self.base_interval
+        expected_local = self.last_server_ts + self.clock_offset + self.cadence + self.arrival_margin
+        delay = expected_local - now
+        if delay >= self.min_interval:
+            return delay
+        if delay >= 0:
+            return self.min_interval
+        # Expected reading is late: keep checking at the base rate for a couple of
+        # cadences, then fall back to one poll per cadence (device probably offline).
+        if -delay < 2 * self.cadence:
+            return min(self.base_interval, self.cadence)
+        return self.cadence
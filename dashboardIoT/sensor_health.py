@@ -0,0 +1,177 @@
+import math
+from collections import deque
+
+
+class RollingStats:
+    """
+    Streaming statistics for one metric, constant memory per metric:
+    Welford mean/variance over all samples, an EWMA, and min/max over the
+    last `window` samples using monotonic deques (amortised O(1) per push).
+    """
+    __slots__ = ("window", "alpha", "count", "mean", "_m2", "ewma",
+                 "_index", "_min_q", "_max_q")
+
+    def __init__(self, window=30, alpha=0.2):
+        self.window = window
+        self.alpha = alpha
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.ewma = None
+        self._index = 0
+        self._min_q = deque()  # (index, value), values increasing
+        self._max_q = deque()  # (index, value), values decreasing
+
+    def push(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.ewma = value if self.ewma is None else self.ewma + self.alpha * (value - self.ewma)
+
+        index = self._index
+        self._index += 1
+        oldest = index - self.window
+        min_q, max_q = self._min_q, self._max_q
+        while min_q and min_q[-1][1] >= value:
+            min_q.pop()
+        min_q.append((index, value))
+        if min_q[0][0] <= oldest:
+            min_q.popleft()
+        while max_q and max_q[-1][1] <= value:
+            max_q.pop()
+        max_q.append((index, value))
+        if max_q[0][0] <= oldest:
+            max_q.popleft()
+
+    @property
+    def variance(self):
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self):
+        return math.sqrt(self.variance)
+
+    @property
+    def window_min(self):
+        return self._min_q[0][1] if self._min_q else None
+
+    @property
+    def window_max(self):
+        return self._max_q[0][1] if self._max_q else None
+
+    @property
+    def window_full(self):
+        return self._index >= self.window
+
+
+class DeviceHealth:
+    """Health state for one device, updated incrementally per reading."""
+    FLATLINE_METRICS = ("temperature", "humidity", "soil_moisture_raw")
+
+    def __init__(self, window=30, heap_leak_rate=-2.0, rssi_weak=-80.0, rssi_drop=10.0,
+                 reboot_window_s=600.0, reboot_loop_count=3):
+        self.heap_leak_rate = heap_leak_rate      # bytes/s, sustained
+        self.rssi_weak = rssi_weak                # dBm
+        self.rssi_drop = rssi_drop                # dB below the long-run mean
+        self.reboot_window_s = reboot_window_s
+        self.reboot_loop_count = reboot_loop_count
+
+        self.stats = {metric: RollingStats(window) for metric in self.FLATLINE_METRICS}
+        self.rssi = RollingStats(window, alpha=0.1)
+        self.heap = RollingStats(window)
+        self.heap_rate = RollingStats(window, alpha=0.1)
+        self.cached = {"temperature_source": RollingStats(window, alpha=0.1),
+                       "humidity_source": RollingStats(window, alpha=0.1)}
+        self.reboots = deque(maxlen=reboot_loop_count)
+
+        self.last_id = None
+        self.last_server_ts = None
+        self.last_uptime_ms = None
+        self.last_free_heap = None
+        self.issues = ()
+
+    def update(self, reading):
+        """Feed one SensorReading; returns the current tuple of issue strings."""
+        # The dashboard polls faster than the ESP32 posts, so skip repeats
+        key = reading.id if reading.id is not None else reading.server_timestamp
+        if key is not None and key == self.last_id:
+            return self.issues
+        self.last_id = key
+        now = reading.server_timestamp
+
+        for metric, stats in self.stats.items():
+            value = getattr(reading, metric)
+            if value is not None:
+                stats.push(value)
+        for field, stats in self.cached.items():
+            source = getattr(reading, field)
+            if source is not None:
+                stats.push(1.0 if source == "cached" else 0.0)
+        if reading.wifi_rssi is not None:
+            self.rssi.push(reading.wifi_rssi)
+
+        uptime_ms = reading.uptime_ms
+        rebooted = uptime_ms is not None and self.last_uptime_ms is not None and uptime_ms < self.last_uptime_ms
+        if rebooted:
+            self.reboots.append(now if now is not None else 0.0)
+            self.heap_rate.reset()
+            self.last_free_heap = None
+
+        free_heap = reading.free_heap
+        if free_heap is not None:
+            self.heap.push(free_heap)
+            if self.last_free_heap is not None and uptime_ms is not None and self.last_uptime_ms is not None:
+                elapsed_s = (uptime_ms - self.last_uptime_ms) / 1000.0
+                if elapsed_s > 0:
+                    self.heap_rate.push((free_heap - self.last_free_heap) / elapsed_s)
+            self.last_free_heap = free_heap
+        if uptime_ms is not None:
+            self.last_uptime_ms = uptime_ms
+        self.last_server_ts = now
+
+        self.issues = self._evaluate(now)
+        return self.issues
+
+    def _evaluate(self, now):
+        issues = []
+        for metric, stats in self.stats.items():
+            if stats.window_full and stats.window_max == stats.window_min:
+                issues.append(f"{metric}: flatline at {stats.window_max:g}")
+        for field, stats in self.cached.items():
+            if stats.count >= 5 and stats.ewma > 0.5:
+                issues.append(f"{field.split('_')[0]}: DHT read failing (cached)")
+
+        if self.heap_rate.window_full and self.heap_rate.ewma < self.heap_leak_rate:
+            issues.append(f"free_heap: leaking {-self.heap_rate.ewma:.1f} B/s")
+
+        if (now is not None and len(self.reboots) == self.reboot_loop_count
+                and now - self.reboots[0] <= self.reboot_window_s):
+            issues.append(f"reboot loop: {len(self.reboots)} reboots in {self.reboot_window_s / 60:.0f} min")
+
+        if self.rssi.count >= 5:
+            if self.rssi.ewma < self.rssi_weak:
+                issues.append(f"wifi_rssi: weak signal ({self.rssi.ewma:.0f} dBm)")
+            elif self.rssi.count >= self.rssi.window and self.rssi.ewma < self.rssi.mean - self.rssi_drop:
+                issues.append(f"wifi_rssi: degrading ({self.rssi.ewma:.0f} vs {self.rssi.mean:.0f} dBm)")
+        return tuple(issues)
+
+
+class HealthMonitor:
+    """Fleet-wide entry point: one DeviceHealth per device_id."""
+    def __init__(self, **device_options):
+        self.device_options = device_options
+        self.devices = {}
+
+    def update(self, reading):
+        device = self.devices.get(reading.device_id)
+        if device is None:
+            device = self.devices[reading.device_id] = DeviceHealth(**self.device_options)
+        return device.update(reading)
+
+    def issues(self, device_id):
+        device = self.devices.get(device_id)
+        return device.issues if device else ()
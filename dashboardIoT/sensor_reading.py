@@ -0,0 +1,137 @@
+from datetime import datetime
+
+
+def _to_float(value):
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+def _to_int(value):
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        try:
+            return int(float(value))
+        except (ValueError, TypeError):
+            return None
+
+def _to_str(value):
+    if value is None:
+        return None
+    return str(value)
+
+def _to_timestamp(value):
+    """Convert an API timestamp (RFC3339 from Go, or epoch seconds) to epoch seconds."""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).replace('Z', '+00:00')
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        pass
+    # Go may send nanosecond fractions, which fromisoformat does not accept
+    head, dot, rest = text.partition('.')
+    if not dot:
+        return None
+    digits = len(rest) - len(rest.lstrip('0123456789'))
+    try:
+        return datetime.fromisoformat(f"{head}.{rest[:min(digits, 6)]}{rest[digits:]}").timestamp()
+    except ValueError:
+        return None
+
+
+# (field, type, aliases) -- aliases are tried in order, first one present wins.
+# Mirrors models.SensorData in the Go API plus the older ESP32 payload names.
+SENSOR_SCHEMA = (
+    ("id", int, ("id",)),
+    ("device_id", int, ("device_id",)),
+    ("temperature", float, ("temperature",)),
+    ("humidity", float, ("humidity",)),
+    ("temperature_source", str, ("temperature_source",)),
+    ("humidity_source", str, ("humidity_source",)),
+    ("soil_moisture_raw", int, ("soil_moisture_raw",)),
+    ("soil_moisture_percent", float, ("soil_moisture_percent", "soil_moisture")),
+    ("water_level_cm", float, ("water_level_cm",)),
+    ("water_percentage", float, ("water_percentage", "water_level")),
+    ("tank_height_cm", float, ("tank_height_cm",)),
+    ("pump_status", str, ("pump_status",)),
+    ("pump_pwm_value", int, ("pump_pwm_value",)),
+    ("pump_percentage", int, ("pump_percentage",)),
+    ("system_status", str, ("system_status",)),
+    ("logic_explanation", str, ("logic_explanation",)),
+    ("wifi_rssi", int, ("wifi_rssi",)),
+    ("free_heap", int, ("free_heap",)),
+    ("uptime_ms", int, ("uptime_ms",)),
+    ("device_timestamp", datetime, ("device_timestamp",)),
+    ("server_timestamp", datetime, ("server_timestamp",)),
+)
+
+_COERCERS = {float: _to_float, int: _to_int, str: _to_str, datetime: _to_timestamp}
+
+
+class SensorReading:
+    """
+    One decoded sensor reading. Numeric fields are already coerced (None when
+    missing or invalid) and timestamps are epoch seconds, so cards, history and
+    alerts can all share the same object without re-parsing.
+    """
+    __slots__ = tuple(field for field, _, _ in SENSOR_SCHEMA)
+
+    def __init__(self, **values):
+        for field in self.__slots__:
+            setattr(self, field, values.get(field))
+
+    def get(self, field, default=None):
+        value = getattr(self, field, None)
+        return default if value is None else value
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __repr__(self):
+        return (f"SensorReading(device_id={self.device_id}, id={self.id}, "
+                f"temperature={self.temperature}, humidity={self.humidity}, "
+                f"soil={self.soil_moisture_percent}, water={self.water_percentage}, "
+                f"pump={self.pump_status})")
+
+
+def compile_decoder(schema=SENSOR_SCHEMA, reading_cls=SensorReading):
+    """
+    Build a decode(raw_dict) -> reading function from the schema once.
+    Alias lookups and coercers are resolved here, not on every reading.
+    """
+    plan = []
+    for field, field_type, aliases in schema:
+        coerce = _COERCERS[field_type]
+        if len(aliases) == 1:
+            plan.append((field, aliases[0], None, coerce))
+        else:
+            plan.append((field, None, aliases, coerce))
+    plan = tuple(plan)
+    new = object.__new__
+
+    def decode(raw):
+        reading = new(reading_cls)
+        for field, key, aliases, coerce in plan:
+            if key is not None:
+                value = raw.get(key)
+            else:
+                value = None
+                for alias in aliases:
+                    value = raw.get(alias)
+                    if value is not None:
+                        break
+            setattr(reading, field, None if value is None else coerce(value))
+        return reading
+
+    return decode
+
+
+decode_reading = compile_decoder()
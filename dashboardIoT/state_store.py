@@ -0,0 +1,91 @@
+class StateStore:
+    """
+    Central observable state for the dashboard (device info, latest reading,
+    connection status).
+
+    Widgets subscribe to the fields they display. Updates are diffed against
+    the current value and only changed fields are marked dirty; all dirty
+    fields are flushed together in a single render pass per frame, and each
+    subscriber runs at most once per pass.
+
+    The store is not thread-safe: call update()/set() from the Tk main loop
+    (worker threads should hop over with widget.after(0, ...) first).
+    """
+    MISSING = object()
+
+    def __init__(self, schedule, frame_ms=16, on_error=None):
+        # schedule(delay_ms, callback) -- normally a Tk widget's .after
+        self._schedule = schedule
+        self.frame_ms = frame_ms
+        # on_error(callback, exception); a failing subscriber never skips the others
+        self.on_error = on_error
+        self._values = {}
+        self._dirty = set()
+        self._subscribers = {}  # field -> [subscription, ...]
+        self._flush_pending = False
+
+    def get(self, field, default=None):
+        return self._values.get(field, default)
+
+    def set(self, field, value):
+        self.update({field: value})
+
+    def update(self, changes):
+        """Apply a dict of field changes; schedules a render only if something changed."""
+        values = self._values
+        changed = False
+        for field, value in changes.items():
+            old = values.get(field, self.MISSING)
+            if old is value or (old is not self.MISSING and old == value):
+                continue
+            values[field] = value
+            self._dirty.add(field)
+            changed = True
+        if changed and not self._flush_pending:
+            self._flush_pending = True
+            self._schedule(self.frame_ms, self.flush)
+        return changed
+
+    def subscribe(self, fields, callback, immediate=False):
+        """
+        Call callback(*values) whenever any of fields changes. With immediate=True
+        the callback also runs now for fields that already have a value.
+        """
+        subscription = (tuple(fields), callback)
+        for field in subscription[0]:
+            self._subscribers.setdefault(field, []).append(subscription)
+        if immediate and any(field in self._values for field in subscription[0]):
+            self._notify(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        for field in subscription[0]:
+            subscribers = self._subscribers.get(field)
+            if subscribers and subscription in subscribers:
+                subscribers.remove(subscription)
+
+    def flush(self):
+        """Render pass: notify every subscriber touched by a dirty field exactly once."""
+        self._flush_pending = False
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, set()
+        notified = set()
+        for field in dirty:
+            for subscription in self._subscribers.get(field, ()):
+                key = id(subscription)
+                if key in notified:
+                    continue
+                notified.add(key)
+                try:
+                    self._notify(subscription)
+                except Exception as e:
+                    if self.on_error:
+                        self.on_error(subscription[1], e)
+                    else:
+                        print(f"StateStore: subscriber {subscription[1]!r} failed: {e}")
+
+    def _notify(self, subscription):
+        fields, callback = subscription
+        values = self._values
+        callback(*[values.get(field) for field in fields])
@@ -0,0 +1,59 @@
+import math
+
+from poll_scheduler import AdaptivePollScheduler
+
+
+def simulate(hours, post_interval=30.0, clock_offset=7.0, jitter=0.4, refresh_interval=1.0):
+    """
+    Drive the scheduler with a simulated clock: the device posts every
+    post_interval (+/- a deterministic jitter), the server stamps readings in
+    its own clock (local - clock_offset), and each poll sees the newest post.
+    Returns the seconds between each post and the poll that first showed it.
+    """
+    scheduler = AdaptivePollScheduler(base_interval=refresh_interval)
+    posts = [k * post_interval + jitter * math.sin(k * 1.7) for k in range(int(hours * 3600 / post_interval))]
+    latencies = []
+    now, seen = 0.1, -1
+    while now < posts[-1]:
+        newest = seen
+        while newest + 1 < len(posts) and posts[newest + 1] <= now:
+            newest += 1
+        if newest >= 0:
+            scheduler.on_reading(posts[newest] - clock_offset, now)
+        if newest > seen:
+            latencies.append(now - posts[newest])
+            seen = newest
+        now += scheduler.next_delay(now)
+    return latencies
+
+
+def test_new_readings_show_up_promptly():
+    # Firmware API_SEND_INTERVAL (30 s) with REFRESH_INTERVAL = 1 over 3 days
+    for jitter in (0.0, 0.05, 0.4):
+        latencies = simulate(hours=72, jitter=jitter)[10:]
+        assert sum(latencies) / len(latencies) < 1.0, jitter
+        assert max(latencies) < 2.0, jitter
+
+
+def test_polls_track_cadence_instead_of_base_rate():
+    scheduler = AdaptivePollScheduler(base_interval=1.0)
+    for k in range(10):
+        scheduler.on_reading(k * 30.0, k * 30.0 + 0.2)
+    # Right after a reading, wait most of the cadence rather than polling at 1 Hz
+    assert scheduler.next_delay(270.2) > 25.0
+
+
+def test_late_reading_nudges_offset_up_only_while_due():
+    scheduler = AdaptivePollScheduler(base_interval=1.0)
+    for k in range(5):
+        scheduler.on_reading(k * 30.0, k * 30.0)
+    offset = scheduler.clock_offset
+    scheduler.on_reading(120.0, 130.0)   # not due yet: no change
+    assert scheduler.clock_offset == offset
+    scheduler.on_reading(120.0, 150.5)   # due and missed: creep up
+    assert scheduler.clock_offset > offset
+    nudged = scheduler.clock_offset
+    scheduler.on_reading(120.0, 400.0)   # long gone: device offline, no change
+    assert scheduler.clock_offset == nudged
+    scheduler.on_reading(150.0, 150.6)   # new reading pulls it back down
+    assert scheduler.clock_offset <= 0.6